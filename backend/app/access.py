@@ -0,0 +1,67 @@
+"""
+Group access checks shared by the groups routes.
+
+get_group_access loads a group's member ids with one query and rejects callers
+outside the group. FastAPI caches a dependency's result for the rest of the
+request, and member sets are also kept in-process for GROUP_ACCESS_TTL_SECONDS
+so bursts of requests against the same group skip the query entirely. Routes
+that add or remove members call invalidate_group_access after committing.
+"""
+
+from typing import FrozenSet
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .auth import get_current_user_id
+from .cache import MemoryCacheBackend
+from .config import settings
+from .db import get_async_db
+from .models import GroupMember
+
+_member_cache = MemoryCacheBackend(settings.GROUP_ACCESS_CACHE_SIZE)
+
+class GroupAccess:
+    """The caller's verified membership in a group, plus the group's member ids"""
+
+    def __init__(self, group_id: int, user_id: int, member_ids: FrozenSet[int]):
+        self.group_id = group_id
+        self.user_id = user_id
+        self.member_ids = member_ids
+
+    def require_members(self, *user_ids: int, detail: str = "Users must be members of the group"):
+        """Reject the request with 400 unless every given user is in the group"""
+        if not set(user_ids) <= self.member_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=detail
+            )
+
+async def load_group_member_ids(db: AsyncSession, group_id: int) -> FrozenSet[int]:
+    """Member ids of a group, from the short-lived cache or one query"""
+    key = f"group:{group_id}"
+    member_ids = _member_cache.get(key)
+    if member_ids is None:
+        member_ids = frozenset(
+            (await db.scalars(select(GroupMember.user_id).where(GroupMember.group_id == group_id))).all()
+        )
+        if settings.GROUP_ACCESS_TTL_SECONDS > 0:
+            _member_cache.set(key, member_ids, settings.GROUP_ACCESS_TTL_SECONDS)
+    return member_ids
+
+def invalidate_group_access(group_id: int):
+    """Forget a group's cached member set; call after committing a membership change"""
+    _member_cache.delete(f"group:{group_id}")
+
+async def get_group_access(
+    group_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+) -> GroupAccess:
+    """Route dependency: the caller's access to the group in the path, or 403"""
+    member_ids = await load_group_member_ids(db, group_id)
+    if current_user_id not in member_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this group"
+        )
+    return GroupAccess(group_id, current_user_id, member_ids)
@@ -1,17 +1,26 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import threading
+import time
 from jose import jwt
 import bcrypt
 from fastapi import HTTPException, status, Depends
+from fastapi.requests import HTTPConnection
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .db import get_db
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from .db import get_async_db
 from .models import User
 from .config import settings
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -19,6 +28,48 @@ def verify_password(password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash was made with a cost other than BCRYPT_ROUNDS"""
+    try:
+        # bcrypt hashes look like $2b$<cost>$<salt+digest>
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop"""
+
+    def __init__(self, workers: int, max_pending: int):
+        # bcrypt releases the GIL while hashing, so threads give real parallelism
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                # Shed load instead of queueing logins the client will time out on anyway
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many authentication requests, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -31,10 +82,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm="HS256")
     return encoded_jwt
 
+class _TTLCache:
+    """Small thread-safe LRU whose entries carry their own expiry timestamp"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at: Optional[float]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+# Verified token payloads keyed by token hash, so the HMAC check runs once per token
+_token_cache = _TTLCache(settings.AUTH_TOKEN_CACHE_SIZE)
+# Recently loaded users, so bursts of /me calls skip the users SELECT
+_principal_cache = _TTLCache(settings.AUTH_PRINCIPAL_CACHE_SIZE)
+
 def verify_token(token: str) -> dict:
     """Verify and decode a JWT token"""
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = _token_cache.get(token_hash)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+        # Cache only until the token's own expiry, so expired tokens are re-checked
+        _token_cache.set(token_hash, payload, payload.get("exp"))
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -47,29 +139,58 @@ def verify_token(token: str) -> dict:
             detail="Could not validate credentials"
         )
 
-# Security scheme
-security = HTTPBearer()
-
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
-    token = credentials.credentials
+def user_id_from_token(token: str) -> int:
+    """Verify a JWT and return the user ID it was issued to"""
     payload = verify_token(token)
-    user_id = payload.get("sub")
-    
-    if user_id is None:
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+
+# Security scheme
+security = HTTPBearer()
+
+# Set by /api/batch on its sub-requests, which reuse the principal the batch already verified
+PRINCIPAL_SCOPE_KEY = "budget_tracker.user_id"
+
+def get_current_user_id(
+    connection: HTTPConnection,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> int:
+    """Extract user ID from JWT token"""
+    user_id = connection.scope.get(PRINCIPAL_SCOPE_KEY)
+    if user_id is not None:
+        return user_id
+    
+    return user_id_from_token(credentials.credentials)
+
+def _detached_copy(user: User) -> User:
+    """Copy a user's column values into a detached instance safe to share across sessions"""
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+async def get_current_user(
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get the current authenticated user"""
+    cached = _principal_cache.get(current_user_id)
+    if cached is not None:
+        # Attach a copy of the cached snapshot to this request's session without a SELECT
+        return await db.merge(cached, load=False)
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.scalar(select(User).where(User.id == current_user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    _principal_cache.set(
+        current_user_id, _detached_copy(user), time.time() + settings.AUTH_PRINCIPAL_TTL_SECONDS
+    )
     return user
@@ -0,0 +1,258 @@
+"""
+Read-through response cache for aggregate endpoints.
+
+Entries are keyed per user, per namespace ("dashboard", "reports",
+"budget_usage") and per request parameters. Each (user, namespace) pair has a
+generation stamp that is part of every entry key; writes invalidate by
+bumping the stamp, so entries computed before the write can never be served
+afterwards, even if they are stored late.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .db import AsyncSessionLocal
+
+Compute = Callable[[AsyncSession], Awaitable[Any]]
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Generations get their own LRU of the same size, so trimming entries never drops them
+        self._generations = OrderedDict()
+        # Answer for names trimmed from that LRU: newer than any generation trimmed so far,
+        # so entries stored under a trimmed name's old generations stay unreachable
+        self._generation_floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_generation(self, name: str) -> str:
+        with self._lock:
+            generation = self._generations.get(name)
+            if generation is None:
+                return str(self._generation_floor)
+            self._generations.move_to_end(name)
+            return str(generation)
+
+    def bump_generation(self, name: str):
+        with self._lock:
+            self._generations[name] = time.time_ns()
+            self._generations.move_to_end(name)
+            while len(self._generations) > self.max_entries:
+                _, trimmed = self._generations.popitem(last=False)
+                self._generation_floor = max(self._generation_floor, trimmed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class DiskCacheBackend:
+    """Local-disk cache shared by every worker process on the same host"""
+
+    def __init__(self, directory: str, max_entries: int = 10000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Generations live apart from entries so LRU trimming never drops them
+        self.generations = self.directory / "generations"
+        self.generations.mkdir(exist_ok=True)
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                item = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if item["expires_at"] is not None and item["expires_at"] < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return item["value"]
+
+    def _write(self, path: Path, data: Any):
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(tmp_path, path)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._write(self._path(key), {"value": value, "expires_at": expires_at})
+
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self._sweep()
+
+    def _sweep(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        now = time.time()
+        live = []
+        for path in self.directory.iterdir():
+            if not path.is_file() or path.name.endswith(".tmp"):
+                continue
+            try:
+                with open(path, "r") as f:
+                    expires_at = json.load(f)["expires_at"]
+                if expires_at is not None and expires_at < now:
+                    path.unlink(missing_ok=True)
+                else:
+                    live.append((path.stat().st_mtime, path))
+            except (OSError, ValueError, KeyError):
+                continue
+        live.sort()
+        for _, path in live[:max(0, len(live) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+    def get_generation(self, name: str) -> str:
+        try:
+            with open(self.generations / self._path(name).name, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return "0"
+
+    def bump_generation(self, name: str):
+        # A timestamp needs no read-modify-write, so concurrent bumps are safe
+        self._write(self.generations / self._path(name).name, str(time.time_ns()))
+
+    def clear(self):
+        for path in self.directory.iterdir():
+            if path.is_file():
+                path.unlink(missing_ok=True)
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float, stale_ttl: float = 0.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing = {}
+
+    def _generation(self, user_id: int, namespace: str) -> str:
+        return self.backend.get_generation(f"{user_id}:{namespace}")
+
+    def _entry_key(self, user_id: int, namespace: str, generation: str, version: Optional[int], params: Any) -> str:
+        digest = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return f"{namespace}:{user_id}:{generation}:{version}:{digest}"
+
+    def _store(self, key: str, value: Any):
+        now = time.time()
+        entry = {"value": value, "fresh_until": now + self.ttl}
+        self.backend.set(key, entry, ttl=self.ttl + self.stale_ttl)
+
+    async def _refresh(self, key: str, compute: Compute):
+        """Recompute a stale entry in a background task with its own session"""
+        try:
+            async with AsyncSessionLocal() as db:
+                self._store(key, _dump(await compute(db)))
+        except Exception:
+            pass  # The stale entry simply expires; the next request recomputes
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        user_id: int,
+        params: Any,
+        compute: Compute,
+        db: AsyncSession,
+        version: Optional[int] = None
+    ) -> Any:
+        """
+        Return the cached response for these parameters, computing it on a miss.
+        
+        Pass the data version the response's ETag was built from: another worker can
+        serve a request after a write commits but before its generation bump, and
+        keying by version keeps it from pairing a pre-write body with the new ETag.
+        """
+        key = self._entry_key(user_id, namespace, self._generation(user_id, namespace), version, params)
+        entry = self.backend.get(key)
+        if entry is not None:
+            if entry["fresh_until"] >= time.time():
+                return entry["value"]
+            # Stale-while-revalidate: serve the old value and refresh once in the background
+            if key not in self._refreshing:
+                # Holding the task also keeps it from being garbage-collected mid-flight
+                self._refreshing[key] = asyncio.create_task(self._refresh(key, compute))
+            return entry["value"]
+
+        value = _dump(await compute(db))
+        self._store(key, value)
+        return value
+
+    def invalidate(self, user_id: int, *namespaces: str):
+        """Make every cached entry in these namespaces unreachable for the user"""
+        for namespace in namespaces:
+            self.backend.bump_generation(f"{user_id}:{namespace}")
+
+class NullCache:
+    """Cache that never stores anything (CACHE_BACKEND=none)"""
+
+    async def get_or_compute(self, namespace, user_id, params, compute, db, version=None):
+        return await compute(db)
+
+    def invalidate(self, user_id, *namespaces):
+        pass
+
+def _dump(value: Any) -> Any:
+    """Convert pydantic responses to plain JSON-compatible data for storage"""
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return value
+
+def create_response_cache():
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    if settings.CACHE_BACKEND == "disk":
+        backend = DiskCacheBackend(settings.CACHE_DIR, settings.CACHE_MAX_ENTRIES)
+    else:
+        backend = MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+    return ResponseCache(backend, settings.CACHE_TTL_SECONDS, settings.CACHE_STALE_SECONDS)
+
+response_cache = create_response_cache()
+
+# Namespaces whose results depend on each kind of write
+TRANSACTION_VIEWS = ("dashboard", "reports", "budget_usage", "dashboard_bundle")
+BUDGET_VIEWS = ("budget_usage", "dashboard_bundle")
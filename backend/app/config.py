@@ -17,8 +17,60 @@ class Settings:
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
     DEBUG: bool = os.getenv("DEBUG", "1") == "1"
     
+    # Password hashing: bcrypt cost and the bounded pool that runs it
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))  # beyond this, logins get 503
+    
+    # Auth caches: verified JWT payloads and recently loaded users
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    AUTH_PRINCIPAL_CACHE_SIZE: int = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", "10000"))
+    AUTH_PRINCIPAL_TTL_SECONDS: float = float(os.getenv("AUTH_PRINCIPAL_TTL_SECONDS", "30"))
+    
+    # Group member sets used for access checks, cached per process; member changes
+    # are seen at once by the worker that made them and within the TTL by the rest
+    GROUP_ACCESS_CACHE_SIZE: int = int(os.getenv("GROUP_ACCESS_CACHE_SIZE", "10000"))
+    GROUP_ACCESS_TTL_SECONDS: float = float(os.getenv("GROUP_ACCESS_TTL_SECONDS", "5"))  # 0 disables
+    
+    # Real-time events (WebSocket/SSE)
+    EVENTS_MAX_PENDING: int = int(os.getenv("EVENTS_MAX_PENDING", "256"))  # per connection, then "resync"
+    EVENTS_COALESCE_MS: float = float(os.getenv("EVENTS_COALESCE_MS", "50"))  # burst window before each push
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    
+    # Response compression: brotli or gzip, as negotiated, for bodies of at least this many bytes
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # negative disables
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "4"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "2"))  # high qualities are far too slow per request
+    
+    # /api/batch: sub-requests per batch, and how many GETs may run at once
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))  # keep below DB_POOL_SIZE
+    BATCH_SUB_REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("BATCH_SUB_REQUEST_TIMEOUT_SECONDS", "10"))
+    
+    # Settlement solving moves to a worker process pool for groups with many open balances
+    SETTLEMENT_PROCESS_MIN_MEMBERS: int = int(os.getenv("SETTLEMENT_PROCESS_MIN_MEMBERS", "14"))  # non-zero balances
+    BALANCE_PROCESS_WORKERS: int = int(os.getenv("BALANCE_PROCESS_WORKERS", "2"))
+    
+    # Response cache for dashboard/report/budget-usage endpoints
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")  # memory, disk or none
+    CACHE_DIR: str = os.getenv("CACHE_DIR", ".cache/responses")
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_STALE_SECONDS: float = float(os.getenv("CACHE_STALE_SECONDS", "0"))  # stale-while-revalidate window
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    
     # Database URL for SQLAlchemy
     DATABASE_URL: str = os.getenv("DATABASE_URL", f"postgresql://{user}:{password}@{host}:{port}/{dbname}")
+    
+    # Connection pool (PostgreSQL); size x workers must stay under the pooler's client limit
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; -1 never recycles
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))  # asyncpg prepared statements per connection
+    # pgbouncer transaction pooling can't keep prepared statements across transactions:
+    # on, off, or auto (on for Supabase's transaction pooler port 6543)
+    DB_PGBOUNCER_MODE: str = os.getenv("DB_PGBOUNCER_MODE", "auto")
     class Config:
         env_file = ".env"
         extra = "ignore"  # Optional: ignore any extra env variables
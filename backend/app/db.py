@@ -1,11 +1,121 @@
+import threading
+import time
+from uuid import uuid4
+from fastapi.requests import HTTPConnection
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+# Async drivers used by the request path, keyed by backend name
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+# Supabase's transaction-mode pooler listens here (session mode and direct connections use 5432)
+PGBOUNCER_TRANSACTION_PORT = 6543
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync DATABASE_URL to the matching async driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+def pgbouncer_mode(url: str) -> bool:
+    """Whether connections go through a transaction-pooling pgbouncer"""
+    if settings.DB_PGBOUNCER_MODE in ("on", "off"):
+        return settings.DB_PGBOUNCER_MODE == "on"
+    return make_url(url).port == PGBOUNCER_TRANSACTION_PORT
+
+class PoolWaitStats:
+    """Records how long checkouts wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            with self._wait_lock:
+                self._waits += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def wait_stats(self) -> dict:
+        with self._wait_lock:
+            return {
+                "checkouts": self._waits,
+                "avg_wait_ms": round(self._wait_total / self._waits * 1000, 3) if self._waits else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3)
+            }
+
+class TimedQueuePool(PoolWaitStats, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(PoolWaitStats, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url: str, is_async: bool) -> dict:
+    """Pool and driver options from Settings; SQLite keeps SQLAlchemy's defaults"""
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+    if is_async:
+        if pgbouncer_mode(url):
+            # Statements prepared on one server connection may be run on another, so
+            # disable both statement caches and give every statement a unique name
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+            }
+        else:
+            options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+def pool_stats(engine) -> dict:
+    """Live pool occupancy and checkout wait times for an engine"""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow
+        })
+    if isinstance(pool, PoolWaitStats):
+        stats.update(pool.wait_stats())
+    return stats
+
+# Sync engine for scripts, migrations and anything running outside the event loop
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, is_async=False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers, so DB waits don't block the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL), **engine_options(settings.DATABASE_URL, is_async=True)
+)
+# expire_on_commit=False keeps committed objects readable without an implicit (async) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -14,3 +124,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Set by /api/batch on sequential sub-requests so they run on the batch's session
+SHARED_SESSION_SCOPE_KEY = "budget_tracker.shared_session"
+
+async def get_async_db(connection: HTTPConnection):
+    shared = connection.scope.get(SHARED_SESSION_SCOPE_KEY)
+    if shared is not None:
+        # The batch owns this session; it is closed when the batch request ends
+        yield shared
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
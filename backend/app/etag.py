@@ -0,0 +1,115 @@
+"""
+ETag / If-None-Match support driven by per-user and per-group data versions.
+
+Every write bumps users.data_version (or groups.data_version) in the same
+transaction, so a GET can decide whether the client's copy is current with a
+single primary-key lookup and answer 304 before any heavy query runs.
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .access import GroupAccess, get_group_access
+from .db import get_async_db
+from .models import User, Group, GroupMember
+
+async def bump_user_version(db: AsyncSession, *user_ids: int):
+    """Mark the users' data as changed; call before committing the write"""
+    if user_ids:
+        await db.execute(
+            update(User)
+            .where(User.id.in_(sorted(set(user_ids))))
+            .values(data_version=User.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+async def bump_group_version(db: AsyncSession, group_id: int):
+    """Mark a group's data as changed; call before committing the write"""
+    await db.execute(
+        update(Group)
+        .where(Group.id == group_id)
+        .values(data_version=Group.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def check_etag(request: Request, response: Response, tag: str):
+    """Answer 304 if the client already has this version, otherwise attach the ETag"""
+    # The day is part of the tag because some defaults (current month, trend window) move with time
+    day = datetime.now(timezone.utc).strftime("%Y%m%d")
+    etag = f'W/"{tag}.{day}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+def user_etag(get_user_id: Callable[..., int]):
+    """
+    Build a route dependency that tags responses with the caller's data version.
+    It returns that version so cached handlers can key their entries by it too.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        current_user_id: int = Depends(get_user_id)
+    ) -> Optional[int]:
+        version = await db.scalar(select(User.data_version).where(User.id == current_user_id))
+        if version is not None:
+            check_etag(request, response, f"u{current_user_id}-{version}")
+        return version
+    return dependency
+
+async def group_etag(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
+):
+    """Route dependency that tags group responses with the group's data version"""
+    # Membership was already checked (and cached for the handler) by get_group_access
+    version = await db.scalar(select(Group.data_version).where(Group.id == access.group_id))
+    if version is not None:
+        check_etag(request, response, f"g{access.group_id}-{version}-u{access.user_id}")
+
+def groups_etag(get_user_id: Callable[..., int]):
+    """Build a route dependency that tags the group list with the caller's and their groups' versions"""
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        current_user_id: int = Depends(get_user_id)
+    ):
+        # Versions only grow, so any write to any of the caller's groups changes their sum;
+        # the id count and sum change when the caller joins or leaves a group
+        row = (await db.execute(
+            select(
+                User.data_version,
+                func.count(Group.id),
+                func.coalesce(func.sum(Group.id), 0),
+                func.coalesce(func.sum(Group.data_version), 0)
+            ).select_from(User).outerjoin(
+                GroupMember, GroupMember.user_id == User.id
+            ).outerjoin(
+                Group, Group.id == GroupMember.group_id
+            ).where(User.id == current_user_id).group_by(User.id, User.data_version)
+        )).first()
+        if row is not None:
+            check_etag(request, response, f"u{current_user_id}-{row[0]}-g{row[1]}.{row[2]}.{row[3]}")
+    return dependency
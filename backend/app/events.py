@@ -0,0 +1,119 @@
+"""
+In-process pub/sub for pushing data changes to connected clients.
+
+Routers publish after their write commits, to "user:{id}" topics for personal
+data and "group:{id}" topics for shared group data. Every subscriber has its
+own bounded buffer of pending events:
+
+- Events with the same (topic, type, key) coalesce, so only the latest is
+  delivered. A burst of edits to one transaction is pushed once, and a run of
+  balance changes becomes one "refetch balances" hint.
+- A subscriber that falls more than EVENTS_MAX_PENDING events behind has that
+  topic's backlog replaced by a single "resync" event, so a slow connection
+  costs bounded memory and never slows down publishers.
+
+The broker lives in one process. With several API workers, a client only sees
+changes made through the worker it is connected to.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+from .config import settings
+
+RESYNC = "resync"
+
+def user_topic(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def group_topic(group_id: int) -> str:
+    return f"group:{group_id}"
+
+class Subscription:
+    """One client's view of the broker: its topics and its coalescing buffer"""
+
+    def __init__(self, broker: "EventBroker", topics: Iterable[str], max_pending: int):
+        self.broker = broker
+        self.topics: Set[str] = set(topics)
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._overflowed: Set[str] = set()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: dict):
+        topic = event["topic"]
+        if topic in self._overflowed:
+            return  # a resync for this topic is already queued
+        key = (topic, event["type"], event.get("key"))
+        if key in self._pending:
+            self._pending[key] = event
+        elif len(self._pending) < self.max_pending:
+            self._pending[key] = event
+        else:
+            # Too far behind: drop this topic's backlog and ask the client to refetch
+            for pending_key in [pending_key for pending_key in self._pending if pending_key[0] == topic]:
+                del self._pending[pending_key]
+            self._pending[(topic, RESYNC, None)] = {"topic": topic, "type": RESYNC, "data": {}}
+            self._overflowed.add(topic)
+        self._ready.set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[dict]:
+        """Wait for events, give bursts a moment to coalesce, then drain the buffer"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        if settings.EVENTS_COALESCE_MS > 0:
+            await asyncio.sleep(settings.EVENTS_COALESCE_MS / 1000)
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self._overflowed.clear()
+        self._ready.clear()
+        return batch
+
+    def follow(self, topic: str):
+        self.topics.add(topic)
+        self.broker._index(self, topic)
+
+    def unfollow(self, topic: str):
+        self.topics.discard(topic)
+        self.broker._unindex(self, topic)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class EventBroker:
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def _index(self, subscription: Subscription, topic: str):
+        self._subscribers.setdefault(topic, set()).add(subscription)
+
+    def _unindex(self, subscription: Subscription, topic: str):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(self, topics, self.max_pending)
+        for topic in subscription.topics:
+            self._index(subscription, topic)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in list(subscription.topics):
+            self._unindex(subscription, topic)
+
+    def publish(self, topic: str, type: str, data: Optional[Dict[str, Any]] = None, key: Hashable = None):
+        """Queue an event for every subscriber of the topic; call only after the write commits"""
+        event = {"topic": topic, "type": type, "key": key, "data": data or {}}
+        for subscription in list(self._subscribers.get(topic, ())):
+            subscription.offer(event)
+
+    def subscriber_count(self) -> int:
+        return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+event_broker = EventBroker(settings.EVENTS_MAX_PENDING)
@@ -1,17 +1,25 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import text
 import os
-from .routers import auth, transactions, budgets, reports, groups, dashboard
-from .db import engine, Base
+import time
+from .config import settings
+from .compression import CompressionMiddleware
+from .db import async_engine, pool_stats, pgbouncer_mode
+from .utils.balance_engine import shutdown_process_pool
+from .routers import auth, transactions, budgets, reports, groups, dashboard, batch, events
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+try:
+    import orjson
+except ImportError:  # the stdlib encoder still works, just slower on large lists
+    orjson = None
 
 app = FastAPI(
     title="Budget Tracker API",
     description="FastAPI backend for budget tracking application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # CORS middleware - Updated for Railway deployment
@@ -24,11 +32,42 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+if settings.COMPRESSION_MIN_SIZE >= 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+
+@app.on_event("shutdown")
+def stop_balance_workers():
+    shutdown_process_pool()
+
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
     return {"ok": True}
 
+@app.get("/api/health/ready")
+async def readiness_check():
+    """Report database reachability and connection pool usage"""
+    started = time.perf_counter()
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        database = {"reachable": True, "latency_ms": round((time.perf_counter() - started) * 1000, 3)}
+    except Exception as e:
+        database = {"reachable": False, "error": type(e).__name__}
+    
+    body = {
+        "ok": database["reachable"],
+        "database": database,
+        "pool": pool_stats(async_engine),
+        "pgbouncer_mode": pgbouncer_mode(settings.DATABASE_URL)
+    }
+    return JSONResponse(status_code=200 if body["ok"] else 503, content=body)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(transactions.router, prefix="/api/transactions", tags=["transactions"])
@@ -36,6 +75,8 @@ app.include_router(budgets.router, prefix="/api/budgets", tags=["budgets"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 app.include_router(groups.router, prefix="/api/groups", tags=["groups"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
+app.include_router(batch.router, prefix="/api/batch", tags=["batch"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
 
 if __name__ == "__main__":
     import uvicorn
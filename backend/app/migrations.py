@@ -0,0 +1,71 @@
+"""
+Versioned schema migrations.
+
+Migrations are plain SQL files in backend/migrations named NNNN_description.sql
+and are applied in order, once each, with the applied versions recorded in the
+schema_migrations table. A file whose first line is "-- migrate: no-transaction"
+runs statement by statement in autocommit mode so it can use
+CREATE INDEX CONCURRENTLY. Statements are split on semicolons, so keep
+literal semicolons out of migration bodies.
+"""
+
+from pathlib import Path
+from typing import List, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from .db import Base
+from . import models  # noqa: F401  (registers tables on Base.metadata)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+
+def discover_migrations() -> List[Tuple[str, Path]]:
+    """Return (version, path) pairs for every migration file, in order"""
+    return sorted(
+        (path.name.split("_", 1)[0], path)
+        for path in MIGRATIONS_DIR.glob("*.sql")
+    )
+
+def _split_statements(sql: str) -> List[str]:
+    """Split a migration script on statement-terminating semicolons"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+def applied_versions(engine: Engine) -> set:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(32) PRIMARY KEY, "
+            "applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW())"
+        ))
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Apply all pending migrations and return the versions that were applied"""
+    if engine.dialect.name != "postgresql":
+        # The SQL migrations are PostgreSQL-specific; local SQLite dev databases
+        # are built straight from the models instead
+        Base.metadata.create_all(bind=engine)
+        return []
+
+    done = applied_versions(engine)
+    applied = []
+    for version, path in discover_migrations():
+        if version in done:
+            continue
+
+        sql = path.read_text()
+        record = text("INSERT INTO schema_migrations (version) VALUES (:version)")
+        if sql.lstrip().startswith(NO_TRANSACTION_MARKER):
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                for statement in _split_statements(sql):
+                    conn.exec_driver_sql(statement)
+                conn.execute(record, {"version": version})
+        else:
+            with engine.begin() as conn:
+                for statement in _split_statements(sql):
+                    conn.exec_driver_sql(statement)
+                conn.execute(record, {"version": version})
+        applied.append(version)
+
+    return applied
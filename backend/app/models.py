@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Boolean, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .db import Base
@@ -10,6 +11,7 @@ class User(Base):
     name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")  # bumped on every write
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -33,6 +35,23 @@ class Transaction(Base):
     # Relationships
     user = relationship("User", back_populates="transactions")
 
+# Indexes for the hot query shapes (created by migrations/0002_hot_query_indexes.sql)
+Index("ix_transactions_user_date_id", Transaction.user_id, Transaction.date.desc(), Transaction.id.desc())
+Index("ix_transactions_user_type_date", Transaction.user_id, Transaction.type, Transaction.date,
+      postgresql_include=["amount"])
+Index("ix_transactions_user_category_date", Transaction.user_id, Transaction.category, Transaction.date,
+      postgresql_include=["type", "amount"])
+
+class TransactionMonthlyRollup(Base):
+    __tablename__ = "transaction_monthly_rollups"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month = Column(String(7), primary_key=True)  # YYYY-MM format
+    type = Column(String(20), primary_key=True)
+    category = Column(String(100), primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
 class Budget(Base):
     __tablename__ = "budgets"
     
@@ -46,6 +65,8 @@ class Budget(Base):
     # Relationships
     user = relationship("User", back_populates="budgets")
 
+Index("ix_budgets_user_month_category", Budget.user_id, Budget.month, Budget.category)
+
 class Group(Base):
     __tablename__ = "groups"
     
@@ -53,6 +74,7 @@ class Group(Base):
     name = Column(String(100), nullable=False)
     description = Column(Text)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")  # bumped on every write
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -72,6 +94,9 @@ class GroupMember(Base):
     group = relationship("Group", back_populates="members")
     user = relationship("User", back_populates="group_memberships")
 
+Index("ix_group_members_group_user", GroupMember.group_id, GroupMember.user_id)
+Index("ix_group_members_user", GroupMember.user_id)
+
 class GroupExpense(Base):
     __tablename__ = "group_expenses"
     
@@ -82,12 +107,31 @@ class GroupExpense(Base):
     description = Column(String(255), nullable=False)
     category = Column(String(100), nullable=False)
     date = Column(DateTime(timezone=True), nullable=False)
-    splits = Column(JSON, nullable=False)  # [{"user_id": 1, "weight": 2}, ...]
+    splits = Column(JSON, nullable=False)  # [{"user_id": 1, "weight": 2}, ...] as submitted
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     group = relationship("Group", back_populates="expenses")
     paid_by_user = relationship("User", back_populates="group_expenses")
+    split_rows = relationship("GroupExpenseSplit", back_populates="expense", cascade="all, delete-orphan")
+
+# Activity feed keyset indexes (created by migrations/0007_group_activity_indexes.sql)
+Index("ix_group_expenses_group_date_id", GroupExpense.group_id, GroupExpense.date.desc(), GroupExpense.id.desc())
+Index("ix_group_expenses_group_category_date_id", GroupExpense.group_id, GroupExpense.category,
+      GroupExpense.date.desc(), GroupExpense.id.desc())
+
+class GroupExpenseSplit(Base):
+    __tablename__ = "group_expense_splits"
+    
+    expense_id = Column(Integer, ForeignKey("group_expenses.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    weight = Column(Float, nullable=False)
+    owed_amount = Column(Float, nullable=False)  # weight / total weight * expense amount
+    
+    # Relationships
+    expense = relationship("GroupExpense", back_populates="split_rows")
+
+Index("ix_group_expense_splits_user", GroupExpenseSplit.user_id)
 
 class Settlement(Base):
     __tablename__ = "settlements"
@@ -98,7 +142,17 @@ class Settlement(Base):
     to_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(Float, nullable=False)
     description = Column(String(255))
-    settled_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python too, so SQLite stores it in the same format the activity cursor binds
+    settled_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     
     # Relationships
     group = relationship("Group", back_populates="settlements")
+
+Index("ix_settlements_group_settled_id", Settlement.group_id, Settlement.settled_at.desc(), Settlement.id.desc())
+
+class GroupBalance(Base):
+    __tablename__ = "group_balances"
+    
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    balance = Column(Float, nullable=False, default=0.0)  # positive: the group owes this user
@@ -0,0 +1,188 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.routing import Match
+from typing import List, Optional
+from urllib.parse import urlencode
+import asyncio
+import json
+from ..db import get_async_db, SHARED_SESSION_SCOPE_KEY
+from ..schemas import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+from ..auth import get_current_user_id, PRINCIPAL_SCOPE_KEY
+from ..config import settings
+
+router = APIRouter()
+
+ALLOWED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# Reads have no side effects, so runs of them can be dispatched together
+PARALLEL_METHODS = {"GET"}
+# Sub-request headers that must come from the batch itself
+RESERVED_HEADERS = {"authorization", "host", "content-length", "content-type", "accept-encoding"}
+# Endpoints that stream their response; a batch would buffer them whole or never finish
+STREAMING_PATHS = ("/api/events", "/api/transactions/export")
+
+class _StreamingResponseRejected(Exception):
+    pass
+
+def _match_trailing_slash(request: Request, scope: dict):
+    """
+    Add or drop a trailing slash where the router would otherwise answer with a
+    redirect, since a sub-request has no client to follow it.
+    """
+    routes = request.app.router.routes
+    if scope["path"] == "/" or any(route.matches(scope)[0] != Match.NONE for route in routes):
+        return
+    path = scope["path"]
+    alternate = path.rstrip("/") if path.endswith("/") else path + "/"
+    if any(route.matches({**scope, "path": alternate})[0] != Match.NONE for route in routes):
+        scope["path"] = alternate
+        scope["raw_path"] = alternate.encode("utf-8")
+
+def _sub_scope(request: Request, sub: BatchSubRequest, user_id: int, db: Optional[AsyncSession]) -> dict:
+    """Build the ASGI scope for one sub-request, inheriting the batch's connection details"""
+    path, _, query = sub.path.partition("?")
+    if sub.params:
+        extra = urlencode(
+            {key: value for key, value in sub.params.items() if value is not None}, doseq=True
+        )
+        query = f"{query}&{extra}" if query else extra
+
+    headers = [(b"authorization", request.headers.get("authorization", "").encode("latin-1"))]
+    if sub.body is not None:
+        headers.append((b"content-type", b"application/json"))
+    for name, value in (sub.headers or {}).items():
+        if name.lower() not in RESERVED_HEADERS:
+            headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub.method.upper(),
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "headers": headers,
+        PRINCIPAL_SCOPE_KEY: user_id
+    }
+    if db is not None:
+        scope[SHARED_SESSION_SCOPE_KEY] = db
+    _match_trailing_slash(request, scope)
+    return scope
+
+def _error(sub: BatchSubRequest, status_code: int, detail: str) -> BatchSubResponse:
+    return BatchSubResponse(id=sub.id, status=status_code, headers={}, body={"detail": detail})
+
+async def _dispatch(request: Request, sub: BatchSubRequest, user_id: int, db: Optional[AsyncSession]) -> BatchSubResponse:
+    """Run one sub-request through the app in-process and capture its response"""
+    path = sub.path.partition("?")[0]
+    if any(path == prefix or path.startswith(prefix + "/") for prefix in STREAMING_PATHS):
+        return _error(sub, status.HTTP_400_BAD_REQUEST, f"Streaming endpoints can't be batched: {path}")
+
+    body = json.dumps(sub.body).encode("utf-8") if sub.body is not None else b""
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # There is no client connection behind a sub-request, so anything still
+        # listening (e.g. a streaming response) is told it has gone away
+        return {"type": "http.disconnect"}
+
+    started = {}
+    chunks = []
+    streaming = False
+
+    async def send(message):
+        nonlocal streaming
+        if message["type"] == "http.response.start":
+            started.update(message)
+        elif message["type"] == "http.response.body":
+            if message.get("more_body", False):
+                # Responses are buffered whole, so streamed ones are refused rather than collected
+                streaming = True
+                raise _StreamingResponseRejected()
+            chunks.append(message.get("body", b""))
+
+    try:
+        await asyncio.wait_for(
+            request.app(_sub_scope(request, sub, user_id, db), receive, send),
+            settings.BATCH_SUB_REQUEST_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        return _error(sub, status.HTTP_504_GATEWAY_TIMEOUT, "Sub-request timed out")
+    except Exception:
+        if streaming:
+            return _error(sub, status.HTTP_400_BAD_REQUEST, f"Streaming responses can't be batched: {path}")
+        # The error middleware has usually sent a 500 already; make sure one is reported
+        if not started:
+            started["status"] = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in started.get("headers", [])
+        if name.lower() != b"content-length"
+    }
+    raw = b"".join(chunks)
+    content = None
+    if raw:
+        if headers.get("content-type", "").startswith("application/json"):
+            content = json.loads(raw)
+        else:
+            content = raw.decode("utf-8", errors="replace")
+    return BatchSubResponse(id=sub.id, status=started.get("status", 500), headers=headers, body=content)
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Run several API calls in one round trip and return their responses in order"""
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests"
+        )
+    for sub in batch.requests:
+        if sub.method.upper() not in ALLOWED_METHODS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported method: {sub.method}"
+            )
+        if not sub.path.startswith("/api/") or sub.path.startswith("/api/batch"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported path: {sub.path}"
+            )
+
+    # Consecutive reads run concurrently, each on its own pooled session, since one
+    # AsyncSession can't run two queries at once. Writes run one at a time, in order,
+    # on the batch's session, and act as barriers so later reads see their effects.
+    limiter = asyncio.Semaphore(max(1, settings.BATCH_MAX_CONCURRENCY))
+
+    async def read(sub: BatchSubRequest) -> BatchSubResponse:
+        async with limiter:
+            return await _dispatch(request, sub, current_user_id, None)
+
+    responses: List[BatchSubResponse] = []
+    reads: List[BatchSubRequest] = []
+    for sub in batch.requests + [None]:
+        if sub is not None and sub.method.upper() in PARALLEL_METHODS:
+            reads.append(sub)
+            continue
+        if reads:
+            responses.extend(await asyncio.gather(*(read(item) for item in reads)))
+            reads = []
+        if sub is not None:
+            responses.append(await _dispatch(request, sub, current_user_id, db))
+            # Don't let a failed write's leftovers leak into the next one
+            await db.rollback()
+
+    return BatchResponse(responses=responses)
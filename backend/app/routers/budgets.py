@@ -1,52 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from datetime import datetime
-from ..db import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select, literal, union_all, Float
+from typing import List, Optional
+from ..db import get_async_db
 from ..models import Budget, Transaction
-from ..schemas import BudgetCreate, BudgetResponse, BudgetUsageResponse
-from ..auth import verify_token
+from ..schemas import (
+    BudgetCreate, BudgetResponse, BudgetUsageResponse, BudgetUsageCell,
+    BudgetCategoryUsage, BudgetUsageMatrixResponse
+)
+from ..auth import get_current_user_id
+from ..etag import bump_user_version, user_etag
+from ..cache import response_cache, BUDGET_VIEWS
+from ..utils.dates import parse_month, month_range, months_between, year_month
 
 router = APIRouter()
-security = HTTPBearer()
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """Extract user ID from JWT token"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    return int(payload["sub"])
-
-@router.get("/", response_model=list[BudgetResponse])
+@router.get("/", response_model=list[BudgetResponse], dependencies=[Depends(user_etag(get_current_user_id))])
 async def get_budgets(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Get all budgets for the current user"""
-    budgets = db.query(Budget).filter(Budget.user_id == current_user_id).all()
-    return budgets
+    budgets = await db.scalars(select(Budget).where(Budget.user_id == current_user_id))
+    return budgets.all()
 
 @router.post("/", response_model=BudgetResponse)
 async def create_or_update_budget(
     budget_data: BudgetCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Create or update a budget for a category and month"""
     # Check if budget already exists for this category and month
-    existing_budget = db.query(Budget).filter(
-        and_(
-            Budget.user_id == current_user_id,
-            Budget.category == budget_data.category,
-            Budget.month == budget_data.month
+    existing_budget = await db.scalar(
+        select(Budget).where(
+            and_(
+                Budget.user_id == current_user_id,
+                Budget.category == budget_data.category,
+                Budget.month == budget_data.month
+            )
         )
-    ).first()
+    )
     
     if existing_budget:
         # Update existing budget
         existing_budget.limit = budget_data.limit
-        db.commit()
-        db.refresh(existing_budget)
+        await bump_user_version(db, current_user_id)
+        await db.commit()
+        response_cache.invalidate(current_user_id, *BUDGET_VIEWS)
+        await db.refresh(existing_budget)
         return existing_budget
     else:
         # Create new budget
@@ -55,51 +57,150 @@ async def create_or_update_budget(
             **budget_data.dict()
         )
         db.add(db_budget)
-        db.commit()
-        db.refresh(db_budget)
+        await bump_user_version(db, current_user_id)
+        await db.commit()
+        response_cache.invalidate(current_user_id, *BUDGET_VIEWS)
+        await db.refresh(db_budget)
         return db_budget
 
+MAX_USAGE_MONTHS = 60
+
+async def build_budget_usage_matrix(db: AsyncSession, user_id: int, months: List[str]) -> BudgetUsageMatrixResponse:
+    """Compute the category x month usage matrix for a list of consecutive months"""
+    start_date = parse_month(months[0])
+    end_date = month_range(months[-1])[1]
+    
+    budget_filter = and_(
+        Budget.user_id == user_id,
+        Budget.month >= months[0],
+        Budget.month <= months[-1]
+    )
+    budgeted_categories = select(Budget.category).where(budget_filter).distinct()
+    
+    # Budget limits and per-month spend come back together in one round trip
+    limits = select(
+        Budget.category,
+        Budget.month,
+        Budget.limit.label("limit"),
+        literal(None, Float).label("spent")
+    ).where(budget_filter)
+    month = year_month(Transaction.date)
+    spending = select(
+        Transaction.category,
+        month.label("month"),
+        literal(None, Float).label("limit"),
+        func.sum(Transaction.amount).label("spent")
+    ).where(
+        and_(
+            Transaction.user_id == user_id,
+            Transaction.type == "expense",
+            Transaction.category.in_(budgeted_categories),
+            Transaction.date >= start_date,
+            Transaction.date < end_date
+        )
+    ).group_by(Transaction.category, month)
+    
+    cells = {}
+    for row in await db.execute(union_all(limits, spending)):
+        cell = cells.setdefault((row.category, row.month), {"limit": None, "spent": 0.0})
+        if row.limit is not None:
+            cell["limit"] = row.limit
+        if row.spent is not None:
+            cell["spent"] = row.spent
+    
+    categories = sorted({category for category, _ in cells})
+    matrix = []
+    for category in categories:
+        row_cells = []
+        for month_str in months:
+            cell = cells.get((category, month_str), {"limit": None, "spent": 0.0})
+            remaining = cell["limit"] - cell["spent"] if cell["limit"] is not None else None
+            row_cells.append(BudgetUsageCell(
+                month=month_str,
+                limit=cell["limit"],
+                spent=cell["spent"],
+                remaining=remaining
+            ))
+        matrix.append(BudgetCategoryUsage(category=category, months=row_cells))
+    
+    return BudgetUsageMatrixResponse(months=months, categories=matrix)
+
+@router.get("/usage", response_model=BudgetUsageMatrixResponse)
+async def get_budget_usage_range(
+    from_month: str = Query(..., alias="from", description="First month in YYYY-MM format"),
+    to_month: str = Query(..., alias="to", description="Last month in YYYY-MM format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    data_version: Optional[int] = Depends(user_etag(get_current_user_id))
+):
+    """Get a category x month budget usage matrix for a range of months"""
+    months = months_between(from_month, to_month)
+    if not months:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+    if len(months) > MAX_USAGE_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range may span at most {MAX_USAGE_MONTHS} months"
+        )
+    return await response_cache.get_or_compute(
+        "budget_usage", current_user_id, {"view": "matrix", "months": [months[0], months[-1]]},
+        lambda session: build_budget_usage_matrix(session, current_user_id, months), db,
+        version=data_version
+    )
+
+async def build_budget_usage(db: AsyncSession, user_id: int, month: str) -> List[BudgetUsageResponse]:
+    """Compute each budget's spend for a normalized YYYY-MM month"""
+    start_date, end_date = month_range(month)
+    
+    # Sum the month's expenses per category once and join them onto the budgets
+    spent = select(
+        Transaction.category,
+        func.sum(Transaction.amount).label("spent")
+    ).where(
+        and_(
+            Transaction.user_id == user_id,
+            Transaction.type == "expense",
+            Transaction.date >= start_date,
+            Transaction.date < end_date
+        )
+    ).group_by(Transaction.category).subquery()
+    
+    rows = await db.execute(
+        select(
+            Budget.category,
+            Budget.limit,
+            func.coalesce(spent.c.spent, 0.0).label("spent")
+        ).outerjoin(
+            spent, spent.c.category == Budget.category
+        ).where(
+            and_(Budget.user_id == user_id, Budget.month == month)
+        )
+    )
+    
+    return [
+        BudgetUsageResponse(
+            category=row.category,
+            limit=row.limit,
+            spent=row.spent,
+            remaining=row.limit - row.spent
+        )
+        for row in rows
+    ]
+
 @router.get("/usage/{month}", response_model=list[BudgetUsageResponse])
 async def get_budget_usage(
     month: str,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    data_version: Optional[int] = Depends(user_etag(get_current_user_id))
 ):
     """Get budget usage for a specific month"""
-    # Get all budgets for the month
-    budgets = db.query(Budget).filter(
-        and_(Budget.user_id == current_user_id, Budget.month == month)
-    ).all()
-    
-    # Calculate spent amounts for each budget category
-    usage_data = []
-    for budget in budgets:
-        # Calculate total spent in this category for the month
-        start_date = datetime.strptime(f"{month}-01", "%Y-%m-%d")
-        if month.endswith("-12"):
-            end_date = datetime.strptime(f"{month[:4]}-12-31", "%Y-%m-%d")
-        else:
-            next_month = f"{int(month[5:7]) + 1:02d}"
-            end_date = datetime.strptime(f"{month[:4]}-{next_month}-01", "%Y-%m-%d")
-        
-        spent_result = db.query(func.sum(Transaction.amount)).filter(
-            and_(
-                Transaction.user_id == current_user_id,
-                Transaction.category == budget.category,
-                Transaction.type == "expense",
-                Transaction.date >= start_date,
-                Transaction.date < end_date
-            )
-        ).scalar()
-        
-        spent = spent_result or 0.0
-        remaining = budget.limit - spent
-        
-        usage_data.append(BudgetUsageResponse(
-            category=budget.category,
-            limit=budget.limit,
-            spent=spent,
-            remaining=remaining
-        ))
-    
-    return usage_data
+    month = parse_month(month).strftime("%Y-%m")
+    return await response_cache.get_or_compute(
+        "budget_usage", current_user_id, {"view": "month", "month": month},
+        lambda session: build_budget_usage(session, current_user_id, month), db,
+        version=data_version
+    )
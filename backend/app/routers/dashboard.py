@@ -1,74 +1,187 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, desc, or_, select
+from datetime import datetime
 from typing import Optional
-from ..db import get_db
-from ..models import Transaction
-from ..schemas import TransactionResponse, DashboardOverviewResponse, TransactionCategoriesResponse
-from ..auth import verify_token
+from ..db import get_async_db
+from ..models import Budget, Transaction, TransactionMonthlyRollup
+from ..schemas import (
+    DashboardOverviewResponse, TransactionCategoriesResponse, DashboardBundleResponse,
+    BudgetUsageResponse, ReportSummaryResponse, CategorySummary, TrendReportResponse, TrendDataPoint
+)
+from ..auth import get_current_user_id
+from ..etag import user_etag
+from ..cache import response_cache
+from ..utils.dates import parse_month, add_months, period_label
 
 router = APIRouter()
-security = HTTPBearer()
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """Extract user ID from JWT token"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    return int(payload["sub"])
+async def build_dashboard_overview(db: AsyncSession, user_id: int, month: str) -> DashboardOverviewResponse:
+    """Compute the dashboard overview for a normalized YYYY-MM month"""
+    # Monthly income/expense totals come from the pre-aggregated rollups
+    totals = dict((await db.execute(
+        select(
+            TransactionMonthlyRollup.type,
+            func.sum(TransactionMonthlyRollup.total)
+        ).where(
+            and_(
+                TransactionMonthlyRollup.user_id == user_id,
+                TransactionMonthlyRollup.month == month
+            )
+        ).group_by(TransactionMonthlyRollup.type)
+    )).all())
+    income = totals.get("income", 0.0)
+    expense = totals.get("expense", 0.0)
+    
+    # Calculate savings
+    savings = income - expense
+    
+    # Get recent transactions (last 5)
+    recent_transactions = (await db.scalars(
+        select(Transaction).where(
+            Transaction.user_id == user_id
+        ).order_by(desc(Transaction.date), desc(Transaction.id)).limit(5)
+    )).all()
+    
+    return DashboardOverviewResponse(
+        month=month,
+        income=income,
+        expense=expense,
+        savings=savings,
+        recent_transactions=recent_transactions
+    )
 
 @router.get("/overview", response_model=DashboardOverviewResponse)
 async def get_dashboard_overview(
     month: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    data_version: Optional[int] = Depends(user_etag(get_current_user_id))
 ):
     """Get dashboard overview with monthly summary and recent transactions"""
     # Use current month if not specified
     if not month:
         month = datetime.now().strftime("%Y-%m")
+    month = parse_month(month).strftime("%Y-%m")
     
-    # Build date filter for the month
-    start_date = datetime.strptime(f"{month}-01", "%Y-%m-%d")
-    if month.endswith("-12"):
-        end_date = datetime.strptime(f"{month[:4]}-12-31", "%Y-%m-%d")
-    else:
-        next_month = f"{int(month[5:7]) + 1:02d}"
-        end_date = datetime.strptime(f"{month[:4]}-{next_month}-01", "%Y-%m-%d")
-    
-    date_filter = and_(
-        Transaction.user_id == current_user_id,
-        Transaction.date >= start_date,
-        Transaction.date < end_date
+    return await response_cache.get_or_compute(
+        "dashboard", current_user_id, {"view": "overview", "month": month},
+        lambda session: build_dashboard_overview(session, current_user_id, month), db,
+        version=data_version
     )
+
+async def build_dashboard_bundle(
+    db: AsyncSession,
+    user_id: int,
+    month: str,
+    trend_months: int
+) -> DashboardBundleResponse:
+    """Compute overview, budget usage, summary and trend for a normalized YYYY-MM month"""
+    # The trend covers the full months before the current one, like /api/reports/trend
+    current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    trend_buckets = [add_months(current_month, offset) for offset in range(-trend_months, 0)]
+    trend_first, trend_last = trend_buckets[0].strftime("%Y-%m"), trend_buckets[-1].strftime("%Y-%m")
     
-    # Calculate total income
-    income_result = db.query(func.sum(Transaction.amount)).filter(
-        and_(date_filter, Transaction.type == "income")
-    ).scalar()
-    income = income_result or 0.0
+    # Reads run in turn on the request session, in one transaction, rather than on separate connections
+    # One read of the monthly rollups covers every aggregate in the bundle
+    rollups = (await db.execute(
+        select(
+            TransactionMonthlyRollup.month,
+            TransactionMonthlyRollup.type,
+            TransactionMonthlyRollup.category,
+            TransactionMonthlyRollup.total,
+            TransactionMonthlyRollup.count
+        ).where(
+            and_(
+                TransactionMonthlyRollup.user_id == user_id,
+                or_(
+                    TransactionMonthlyRollup.month == month,
+                    TransactionMonthlyRollup.month.between(trend_first, trend_last)
+                )
+            )
+        )
+    )).all()
     
-    # Calculate total expenses
-    expense_result = db.query(func.sum(Transaction.amount)).filter(
-        and_(date_filter, Transaction.type == "expense")
-    ).scalar()
-    expense = expense_result or 0.0
+    budgets = (await db.execute(
+        select(Budget.category, Budget.limit).where(
+            and_(Budget.user_id == user_id, Budget.month == month)
+        )
+    )).all()
     
-    # Calculate savings
-    savings = income - expense
+    recent_transactions = (await db.scalars(
+        select(Transaction).where(
+            Transaction.user_id == user_id
+        ).order_by(desc(Transaction.date), desc(Transaction.id)).limit(5)
+    )).all()
     
-    # Get recent transactions (last 5)
-    recent_transactions = db.query(Transaction).filter(
-        Transaction.user_id == current_user_id
-    ).order_by(desc(Transaction.date)).limit(5).all()
+    month_rows = [row for row in rollups if row.month == month]
+    income = sum(row.total for row in month_rows if row.type == "income")
+    expense = sum(row.total for row in month_rows if row.type == "expense")
+    spent = {row.category: row.total for row in month_rows if row.type == "expense"}
     
-    return DashboardOverviewResponse(
-        month=month,
-        income=income,
-        expense=expense,
-        savings=savings,
-        recent_transactions=recent_transactions
+    trend_totals = {}
+    for row in rollups:
+        if trend_first <= row.month <= trend_last:
+            totals = trend_totals.setdefault(row.month, {"income": 0.0, "expense": 0.0})
+            if row.type in totals:
+                totals[row.type] += row.total
+    trend_data = []
+    for bucket in trend_buckets:
+        totals = trend_totals.get(bucket.strftime("%Y-%m"), {"income": 0.0, "expense": 0.0})
+        trend_data.append(TrendDataPoint(
+            month=bucket.strftime("%Y-%m"),
+            period=period_label(bucket, "month"),
+            income=totals["income"],
+            expense=totals["expense"],
+            savings=totals["income"] - totals["expense"]
+        ))
+    
+    return DashboardBundleResponse(
+        overview=DashboardOverviewResponse(
+            month=month,
+            income=income,
+            expense=expense,
+            savings=income - expense,
+            recent_transactions=recent_transactions
+        ),
+        budget_usage=[
+            BudgetUsageResponse(
+                category=budget.category,
+                limit=budget.limit,
+                spent=spent.get(budget.category, 0.0),
+                remaining=budget.limit - spent.get(budget.category, 0.0)
+            )
+            for budget in budgets
+        ],
+        summary=ReportSummaryResponse(
+            income=income,
+            expense=expense,
+            savings=income - expense,
+            categories=[
+                CategorySummary(category=row.category, total=row.total)
+                for row in month_rows if row.type == "expense" and row.count > 0
+            ]
+        ),
+        trend=TrendReportResponse(granularity="month", trend_data=trend_data)
+    )
+
+@router.get("/bundle", response_model=DashboardBundleResponse)
+async def get_dashboard_bundle(
+    month: Optional[str] = Query(None, description="Month in YYYY-MM format (defaults to the current month)"),
+    trend_months: int = Query(6, ge=1, le=120, description="Number of full months in the trend"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    data_version: Optional[int] = Depends(user_etag(get_current_user_id))
+):
+    """Get everything the dashboard's first paint needs in one response"""
+    if not month:
+        month = datetime.now().strftime("%Y-%m")
+    month = parse_month(month).strftime("%Y-%m")
+    
+    return await response_cache.get_or_compute(
+        "dashboard_bundle", current_user_id, {"month": month, "trend_months": trend_months},
+        lambda session: build_dashboard_bundle(session, current_user_id, month, trend_months), db,
+        version=data_version
     )
 
 @router.get("/categories", response_model=TransactionCategoriesResponse)
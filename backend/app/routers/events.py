@@ -0,0 +1,102 @@
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import List
+import asyncio
+import json
+from ..db import AsyncSessionLocal
+from ..models import GroupMember
+from ..auth import user_id_from_token
+from ..config import settings
+from ..events import event_broker, Subscription, user_topic, group_topic
+
+router = APIRouter()
+
+async def _initial_topics(user_id: int) -> List[str]:
+    """The caller's own topic plus one per group they belong to"""
+    async with AsyncSessionLocal() as db:
+        group_ids = (await db.scalars(
+            select(GroupMember.group_id).where(GroupMember.user_id == user_id)
+        )).all()
+    return [user_topic(user_id)] + [group_topic(group_id) for group_id in group_ids]
+
+def _client_events(subscription: Subscription, user_id: int, batch: List[dict]) -> List[dict]:
+    """Keep group topics in step with membership, and strip broker-internal fields"""
+    for event in batch:
+        if event["topic"] == user_topic(user_id) and event["type"] == "groups.changed":
+            topic = group_topic(event["data"]["group_id"])
+            if event["data"].get("member"):
+                subscription.follow(topic)
+            else:
+                subscription.unfollow(topic)
+    return [
+        {"topic": event["topic"], "type": event["type"], "data": event["data"]}
+        for event in batch
+        if event["topic"] in subscription.topics or event["topic"] == user_topic(user_id)
+    ]
+
+@router.websocket("/ws")
+async def events_websocket(websocket: WebSocket, token: str = Query(..., description="JWT from /api/auth/login")):
+    """Push change events as JSON frames of {"events": [...]}"""
+    # Browsers can't set headers on WebSocket handshakes, so the token travels in the query
+    try:
+        user_id = user_id_from_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    topics = await _initial_topics(user_id)
+    await websocket.accept()
+    subscription = event_broker.subscribe(topics)
+
+    async def push():
+        while True:
+            batch = await subscription.next_batch(settings.EVENTS_HEARTBEAT_SECONDS)
+            events = _client_events(subscription, user_id, batch)
+            # A slow client blocks here while new events keep coalescing in its buffer
+            await websocket.send_json({"events": events} if events else {"type": "ping"})
+
+    async def listen():
+        # Client messages are ignored; reading them is how a disconnect is noticed
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            return
+
+    tasks = [asyncio.create_task(push()), asyncio.create_task(listen())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+@router.get("/stream")
+async def events_stream(request: Request, token: str = Query(..., description="JWT from /api/auth/login")):
+    """Push change events as Server-Sent Events, one message per event"""
+    # EventSource can't send an Authorization header either
+    user_id = user_id_from_token(token)
+    topics = await _initial_topics(user_id)
+    subscription = event_broker.subscribe(topics)
+
+    async def stream():
+        try:
+            yield f"retry: {int(settings.EVENTS_HEARTBEAT_SECONDS * 1000)}\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(settings.EVENTS_HEARTBEAT_SECONDS)
+                events = _client_events(subscription, user_id, batch)
+                if not events:
+                    yield ": ping\n\n"
+                    continue
+                yield "".join(
+                    f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events
+                )
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,40 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from ..db import get_db
-from ..models import Group, GroupMember, GroupExpense, Settlement, User
+from datetime import datetime
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, delete, func, literal_column, null, or_, select, tuple_, union_all
+from ..db import get_async_db
+from ..models import Group, GroupMember, GroupExpense, GroupExpenseSplit, Settlement, User, GroupBalance
 from ..schemas import (
-    GroupCreate, GroupResponse, GroupMemberResponse, GroupExpenseCreate, 
-    GroupExpenseResponse, SettlementCreate, SettlementResponse, GroupBalancesResponse
+    GroupCreate, GroupResponse, GroupSummaryResponse, GroupMemberResponse, GroupExpenseCreate, 
+    GroupExpenseResponse, SettlementCreate, SettlementResponse, GroupBalancesResponse, UserBalance,
+    GroupActivityItem, GroupActivityPageResponse, GroupExpenseSplitResponse
+)
+from ..auth import get_current_user_id
+from ..access import GroupAccess, get_group_access, invalidate_group_access
+from ..etag import bump_user_version, bump_group_version, groups_etag, group_etag
+from ..config import settings
+from ..utils.balance import calculate_minimal_settlements
+from ..utils.balance_engine import offload
+from ..utils.pagination import encode_kind_cursor, decode_kind_cursor
+from ..events import event_broker, user_topic, group_topic
+from ..utils.ledger import (
+    BALANCE_TOLERANCE, add_expense, add_settlement, apply_balance_deltas, expense_split_rows
 )
-from ..auth import verify_token
-from ..utils.balance import calculate_group_balances
 
 router = APIRouter()
-security = HTTPBearer()
-
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """Extract user ID from JWT token"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    return int(payload["sub"])
 
-@router.get("/", response_model=list[GroupResponse])
+@router.get(
+    "/",
+    response_model=Union[list[GroupSummaryResponse], list[GroupResponse]],
+    dependencies=[Depends(groups_etag(get_current_user_id))]
+)
 async def get_groups(
-    db: Session = Depends(get_db),
+    summary: bool = Query(False, description="Include member count, total spent, last activity and your balance"),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Get all groups the user is a member of"""
-    groups = db.query(Group).join(GroupMember).filter(
-        GroupMember.user_id == current_user_id
-    ).all()
-    return groups
+    if not summary:
+        groups = await db.scalars(
+            select(Group).join(GroupMember).where(GroupMember.user_id == current_user_id)
+        )
+        return groups.all()
+    
+    # Everything a group card shows, aggregated per group in one statement; each
+    # aggregate only scans the caller's groups
+    my_groups = select(GroupMember.group_id).where(GroupMember.user_id == current_user_id)
+    member_counts = select(
+        GroupMember.group_id, func.count().label("member_count")
+    ).where(GroupMember.group_id.in_(my_groups)).group_by(GroupMember.group_id).subquery()
+    expense_totals = select(
+        GroupExpense.group_id,
+        func.sum(GroupExpense.amount).label("total_spent"),
+        func.max(GroupExpense.created_at).label("last_expense_at")
+    ).where(GroupExpense.group_id.in_(my_groups)).group_by(GroupExpense.group_id).subquery()
+    settlement_times = select(
+        Settlement.group_id, func.max(Settlement.settled_at).label("last_settled_at")
+    ).where(Settlement.group_id.in_(my_groups)).group_by(Settlement.group_id).subquery()
+    
+    rows = (await db.execute(
+        select(
+            Group,
+            func.coalesce(member_counts.c.member_count, 0).label("member_count"),
+            func.coalesce(expense_totals.c.total_spent, 0.0).label("total_spent"),
+            expense_totals.c.last_expense_at,
+            settlement_times.c.last_settled_at,
+            func.coalesce(GroupBalance.balance, 0.0).label("my_balance")
+        ).join(
+            GroupMember, and_(GroupMember.group_id == Group.id, GroupMember.user_id == current_user_id)
+        ).outerjoin(
+            member_counts, member_counts.c.group_id == Group.id
+        ).outerjoin(
+            expense_totals, expense_totals.c.group_id == Group.id
+        ).outerjoin(
+            settlement_times, settlement_times.c.group_id == Group.id
+        ).outerjoin(
+            GroupBalance, and_(GroupBalance.group_id == Group.id, GroupBalance.user_id == current_user_id)
+        ).order_by(Group.id)
+    )).all()
+    
+    return [
+        GroupSummaryResponse(
+            id=row.Group.id,
+            name=row.Group.name,
+            description=row.Group.description,
+            created_by=row.Group.created_by,
+            created_at=row.Group.created_at,
+            member_count=row.member_count,
+            total_spent=row.total_spent,
+            last_activity_at=max(
+                time for time in (row.Group.created_at, row.last_expense_at, row.last_settled_at)
+                if time is not None
+            ),
+            my_balance=row.my_balance
+        )
+        for row in rows
+    ]
 
 @router.post("/", response_model=GroupResponse)
 async def create_group(
     group_data: GroupCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Create a new group"""
@@ -43,8 +108,7 @@ async def create_group(
         **group_data.dict()
     )
     db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
+    await db.flush()
     
     # Add creator as a member
     db_member = GroupMember(
@@ -52,149 +116,273 @@ async def create_group(
         user_id=current_user_id
     )
     db.add(db_member)
-    db.commit()
+    await bump_user_version(db, current_user_id)
+    await db.commit()
+    invalidate_group_access(db_group.id)
+    event_broker.publish(
+        user_topic(current_user_id), "groups.changed", {"group_id": db_group.id, "member": True}, key=db_group.id
+    )
+    await db.refresh(db_group)
     
     return db_group
 
-@router.get("/{group_id}/members", response_model=list[GroupMemberResponse])
+@router.get("/{group_id}/members", response_model=list[GroupMemberResponse], dependencies=[Depends(group_etag)])
 async def get_group_members(
     group_id: int,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
 ):
     """Get all members of a group"""
-    # Check if user is a member of the group
-    membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == current_user_id)
-    ).first()
-    
-    if not membership:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this group"
-        )
-    
-    members = db.query(GroupMember).filter(GroupMember.group_id == group_id).all()
-    return members
+    # Load each member's user alongside, since the response embeds it
+    members = await db.scalars(
+        select(GroupMember).options(selectinload(GroupMember.user)).where(GroupMember.group_id == group_id)
+    )
+    return members.all()
 
 @router.post("/{group_id}/expenses", response_model=GroupExpenseResponse)
 async def create_group_expense(
     group_id: int,
     expense_data: GroupExpenseCreate,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
 ):
     """Create a new group expense"""
-    # Check if user is a member of the group
-    membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == current_user_id)
-    ).first()
-    
-    if not membership:
+    # Work out each member's share once, for the split rows and the balance ledger alike
+    try:
+        split_rows = expense_split_rows(expense_data.amount, expense_data.splits)
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this group"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
+    # Only members can owe a share; anyone else would unbalance the ledger
+    access.require_members(
+        *{row.user_id for row in split_rows},
+        detail="Every split must belong to a group member"
+    )
+    deltas = {}
+    add_expense(deltas, group_id, access.user_id, expense_data.amount, split_rows)
     
     db_expense = GroupExpense(
         group_id=group_id,
-        paid_by_user_id=current_user_id,
+        paid_by_user_id=access.user_id,
+        split_rows=split_rows,
         **expense_data.dict()
     )
     
     db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
+    await apply_balance_deltas(db, deltas)
+    await bump_group_version(db, group_id)
+    await db.commit()
+    await db.refresh(db_expense)
+    event_broker.publish(
+        group_topic(group_id), "group.expense_created",
+        {"expense": GroupExpenseResponse.model_validate(db_expense).model_dump(mode="json")},
+        key=db_expense.id
+    )
+    event_broker.publish(group_topic(group_id), "group.balances_changed", {"group_id": group_id})
     
     return db_expense
 
-@router.get("/{group_id}/balances", response_model=GroupBalancesResponse)
+@router.get("/{group_id}/balances", response_model=GroupBalancesResponse, dependencies=[Depends(group_etag)])
 async def get_group_balances(
     group_id: int,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
 ):
     """Get group balances and settlement suggestions"""
-    # Check if user is a member of the group
-    membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == current_user_id)
-    ).first()
-    
-    if not membership:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this group"
-        )
-    
-    # Get all group members
-    members = db.query(User).join(GroupMember).filter(
-        GroupMember.group_id == group_id
-    ).all()
-    
-    # Get all group expenses
-    expenses = db.query(GroupExpense).filter(GroupExpense.group_id == group_id).all()
-    
-    # Convert to dict format for balance calculation
-    users_data = [{"id": user.id, "name": user.name} for user in members]
-    expenses_data = [
-        {
-            "paid_by_user_id": expense.paid_by_user_id,
-            "amount": expense.amount,
-            "splits": expense.splits
-        }
-        for expense in expenses
-    ]
-    
-    # Calculate balances and settlements
-    balances, settlements = calculate_group_balances(expenses_data, users_data)
+    # Read the running balances of current members, plus former members who still
+    # owe or are owed, straight from the ledger instead of replaying history
+    members = select(GroupMember.user_id).where(GroupMember.group_id == group_id)
+    holders = select(GroupBalance.user_id).where(
+        and_(GroupBalance.group_id == group_id, func.abs(GroupBalance.balance) > BALANCE_TOLERANCE)
+    )
+    rows = (await db.execute(
+        select(
+            User.id, User.name, func.coalesce(GroupBalance.balance, 0.0).label("balance")
+        ).outerjoin(
+            GroupBalance, and_(GroupBalance.user_id == User.id, GroupBalance.group_id == group_id)
+        ).where(
+            or_(User.id.in_(members), User.id.in_(holders))
+        ).order_by(User.id)
+    )).all()
+    
+    balances = [UserBalance(user_id=row.id, user_name=row.name, balance=row.balance) for row in rows]
+    balances_dict = {row.id: row.balance for row in rows}
+    names_dict = {row.id: row.name for row in rows}
+    # The exact solver can take a few hundred ms on big groups; keep that off the event loop
+    open_balances = sum(1 for balance in balances_dict.values() if abs(balance) > BALANCE_TOLERANCE)
+    if open_balances >= settings.SETTLEMENT_PROCESS_MIN_MEMBERS:
+        settlements = await offload(calculate_minimal_settlements, balances_dict, names_dict)
+    else:
+        settlements = calculate_minimal_settlements(balances_dict, names_dict)
     
     return GroupBalancesResponse(
         balances=balances,
         settlements=settlements
     )
 
+ACTIVITY_KINDS = ("expense", "settlement")
+
+@router.get("/{group_id}/activity", response_model=GroupActivityPageResponse, dependencies=[Depends(group_etag)])
+async def get_group_activity(
+    group_id: int,
+    type: Optional[str] = Query(None, pattern="^(expense|settlement)$", description="Only expenses or only settlements"),
+    category: Optional[str] = Query(None, description="Filter expenses by category (settlements have none)"),
+    member_id: Optional[int] = Query(None, description="Only activity that involves this member"),
+    start: Optional[str] = Query(None, description="Start date (ISO format)"),
+    end: Optional[str] = Query(None, description="End date (ISO format)"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of items to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
+):
+    """Get a page of the group's expenses and settlements, newest first"""
+    start_date = datetime.fromisoformat(start.replace('Z', '+00:00')) if start else None
+    end_date = datetime.fromisoformat(end.replace('Z', '+00:00')) if end else None
+    position = decode_kind_cursor(cursor, ACTIVITY_KINDS) if cursor else None
+    
+    # Each table is read through its own (group_id, time DESC, id DESC) index and capped
+    # at limit + 1 rows, so a page costs the same on day one and year five. At equal
+    # times settlements sort before expenses, which turns the cursor into one seek per table.
+    branches = []
+    if type in (None, "expense"):
+        expenses = select(
+            literal_column("'expense'").label("type"),
+            GroupExpense.id,
+            GroupExpense.date.label("occurred_at"),
+            GroupExpense.amount,
+            GroupExpense.description,
+            GroupExpense.category,
+            GroupExpense.paid_by_user_id.label("user_id"),
+            null().label("to_user_id")
+        ).where(GroupExpense.group_id == group_id)
+        if category:
+            expenses = expenses.where(GroupExpense.category == category)
+        if member_id is not None:
+            expenses = expenses.where(or_(
+                GroupExpense.paid_by_user_id == member_id,
+                select(GroupExpenseSplit.expense_id).where(
+                    and_(GroupExpenseSplit.expense_id == GroupExpense.id, GroupExpenseSplit.user_id == member_id)
+                ).exists()
+            ))
+        if start_date:
+            expenses = expenses.where(GroupExpense.date >= start_date)
+        if end_date:
+            expenses = expenses.where(GroupExpense.date <= end_date)
+        if position:
+            cursor_date, cursor_kind, cursor_id = position
+            if cursor_kind == "expense":
+                expenses = expenses.where(tuple_(GroupExpense.date, GroupExpense.id) < tuple_(cursor_date, cursor_id))
+            else:
+                expenses = expenses.where(GroupExpense.date <= cursor_date)
+        branches.append(expenses.order_by(GroupExpense.date.desc(), GroupExpense.id.desc()).limit(limit + 1))
+    
+    if type in (None, "settlement") and not category:
+        settlements = select(
+            literal_column("'settlement'").label("type"),
+            Settlement.id,
+            Settlement.settled_at.label("occurred_at"),
+            Settlement.amount,
+            Settlement.description,
+            null().label("category"),
+            Settlement.from_user_id.label("user_id"),
+            Settlement.to_user_id
+        ).where(Settlement.group_id == group_id)
+        if member_id is not None:
+            settlements = settlements.where(
+                or_(Settlement.from_user_id == member_id, Settlement.to_user_id == member_id)
+            )
+        if start_date:
+            settlements = settlements.where(Settlement.settled_at >= start_date)
+        if end_date:
+            settlements = settlements.where(Settlement.settled_at <= end_date)
+        if position:
+            cursor_date, cursor_kind, cursor_id = position
+            if cursor_kind == "settlement":
+                settlements = settlements.where(
+                    tuple_(Settlement.settled_at, Settlement.id) < tuple_(cursor_date, cursor_id)
+                )
+            else:
+                settlements = settlements.where(Settlement.settled_at < cursor_date)
+        branches.append(settlements.order_by(Settlement.settled_at.desc(), Settlement.id.desc()).limit(limit + 1))
+    
+    if not branches:
+        return GroupActivityPageResponse(items=[])
+    
+    feed = union_all(*(select(branch.subquery()) for branch in branches)).subquery()
+    rows = (await db.execute(
+        select(feed).order_by(feed.c.occurred_at.desc(), feed.c.type.desc(), feed.c.id.desc()).limit(limit + 1)
+    )).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_kind_cursor(rows[-1].occurred_at, rows[-1].type, rows[-1].id)
+    
+    # Splits for the page's expenses come from the normalized table in one more query
+    expense_ids = [row.id for row in rows if row.type == "expense"]
+    splits = {}
+    if expense_ids:
+        split_rows = await db.scalars(
+            select(GroupExpenseSplit).where(GroupExpenseSplit.expense_id.in_(expense_ids)).order_by(
+                GroupExpenseSplit.expense_id, GroupExpenseSplit.user_id
+            )
+        )
+        for split in split_rows:
+            splits.setdefault(split.expense_id, []).append(split)
+    
+    items = [
+        GroupActivityItem(
+            type=row.type,
+            id=row.id,
+            occurred_at=row.occurred_at,
+            amount=row.amount,
+            description=row.description,
+            category=row.category,
+            user_id=row.user_id,
+            to_user_id=row.to_user_id,
+            splits=[
+                GroupExpenseSplitResponse.model_validate(split) for split in splits.get(row.id, [])
+            ] if row.type == "expense" else None
+        )
+        for row in rows
+    ]
+    return GroupActivityPageResponse(items=items, next_cursor=next_cursor)
+
 @router.post("/{group_id}/settlements", response_model=SettlementResponse)
 async def create_settlement(
     group_id: int,
     settlement_data: SettlementCreate,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
 ):
     """Create a settlement between users"""
-    # Check if user is a member of the group
-    membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == current_user_id)
-    ).first()
-    
-    if not membership:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this group"
-        )
-    
     # Verify both users are members of the group
-    from_membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == settlement_data.from_user_id)
-    ).first()
-    
-    to_membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == settlement_data.to_user_id)
-    ).first()
-    
-    if not from_membership or not to_membership:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Both users must be members of the group"
-        )
+    access.require_members(
+        settlement_data.from_user_id, settlement_data.to_user_id,
+        detail="Both users must be members of the group"
+    )
     
     db_settlement = Settlement(
         group_id=group_id,
         **settlement_data.dict()
     )
     
+    deltas = {}
+    add_settlement(deltas, group_id, settlement_data.from_user_id, settlement_data.to_user_id, settlement_data.amount)
+    
     db.add(db_settlement)
-    db.commit()
-    db.refresh(db_settlement)
+    await apply_balance_deltas(db, deltas)
+    await bump_group_version(db, group_id)
+    await db.commit()
+    await db.refresh(db_settlement)
+    event_broker.publish(
+        group_topic(group_id), "group.settlement_created",
+        {"settlement": SettlementResponse.model_validate(db_settlement).model_dump(mode="json")},
+        key=db_settlement.id
+    )
+    event_broker.publish(group_topic(group_id), "group.balances_changed", {"group_id": group_id})
     
     return db_settlement
 
@@ -202,35 +390,24 @@ async def create_settlement(
 async def add_group_member(
     group_id: int,
     email: str,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
 ):
     """Add a member to a group by email"""
-    # Check if current user is a member of the group
-    membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == current_user_id)
-    ).first()
-    
-    if not membership:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this group"
-        )
-    
-    # Find user by email
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+    # Find the user by email and any existing membership in one query; the membership
+    # is read from the table rather than the cached member set so duplicates can't slip in
+    row = (await db.execute(
+        select(User.id, GroupMember.id.label("member_id")).outerjoin(
+            GroupMember, and_(GroupMember.user_id == User.id, GroupMember.group_id == group_id)
+        ).where(User.email == email).limit(1)
+    )).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Check if user is already a member
-    existing_member = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == user.id)
-    ).first()
-    
-    if existing_member:
+    if row.member_id is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User is already a member of this group"
@@ -239,11 +416,15 @@ async def add_group_member(
     # Add user to group
     db_member = GroupMember(
         group_id=group_id,
-        user_id=user.id
+        user_id=row.id
     )
     db.add(db_member)
-    db.commit()
-    db.refresh(db_member)
+    await bump_group_version(db, group_id)
+    await bump_user_version(db, row.id)
+    await db.commit()
+    invalidate_group_access(group_id)
+    event_broker.publish(group_topic(group_id), "group.member_added", {"user_id": row.id}, key=row.id)
+    event_broker.publish(user_topic(row.id), "groups.changed", {"group_id": group_id, "member": True}, key=group_id)
     
     return {"message": "User added to group successfully"}
 
@@ -251,34 +432,28 @@ async def add_group_member(
 async def remove_group_member(
     group_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+    db: AsyncSession = Depends(get_async_db),
+    access: GroupAccess = Depends(get_group_access)
 ):
     """Remove a member from a group"""
-    # Check if current user is a member of the group
-    membership = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == current_user_id)
-    ).first()
-    
-    if not membership:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this group"
+    # Remove member; the row count, not the cached member set, decides whether they were one
+    result = await db.execute(
+        delete(GroupMember).where(
+            and_(GroupMember.group_id == group_id, GroupMember.user_id == user_id)
         )
+    )
     
-    # Find the member to remove
-    member_to_remove = db.query(GroupMember).filter(
-        and_(GroupMember.group_id == group_id, GroupMember.user_id == user_id)
-    ).first()
-    
-    if not member_to_remove:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User is not a member of this group"
         )
     
-    # Remove member
-    db.delete(member_to_remove)
-    db.commit()
+    await bump_group_version(db, group_id)
+    await bump_user_version(db, user_id)
+    await db.commit()
+    invalidate_group_access(group_id)
+    event_broker.publish(group_topic(group_id), "group.member_removed", {"user_id": user_id}, key=user_id)
+    event_broker.publish(user_topic(user_id), "groups.changed", {"group_id": group_id, "member": False}, key=group_id)
     
     return {"message": "User removed from group successfully"}
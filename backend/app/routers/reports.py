@@ -1,72 +1,49 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, case, select
+from datetime import datetime, date, time, timedelta
 from typing import Optional, List
-from ..db import get_db
-from ..models import Transaction
-from ..schemas import ReportSummaryResponse, CategorySummary, TrendReportResponse
-from ..auth import verify_token
+from ..db import get_async_db
+from ..models import Transaction, TransactionMonthlyRollup
+from ..schemas import ReportSummaryResponse, CategorySummary, TrendReportResponse, TrendDataPoint
+from ..auth import get_current_user_id
+from ..etag import user_etag
+from ..cache import response_cache
+from ..utils.dates import (
+    parse_month, add_months, truncate_date, next_period, period_label, date_bucket
+)
 
 router = APIRouter()
-security = HTTPBearer()
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """Extract user ID from JWT token"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    return int(payload["sub"])
-
-@router.get("/summary", response_model=ReportSummaryResponse)
-async def get_summary_report(
-    month: Optional[str] = Query(None, description="Month in YYYY-MM format"),
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
-):
-    """Get summary report for income, expenses, and savings"""
-    # Build date filter
-    date_filter = Transaction.user_id == current_user_id
-    if month:
-        start_date = datetime.strptime(f"{month}-01", "%Y-%m-%d")
-        if month.endswith("-12"):
-            end_date = datetime.strptime(f"{month[:4]}-12-31", "%Y-%m-%d")
-        else:
-            next_month = f"{int(month[5:7]) + 1:02d}"
-            end_date = datetime.strptime(f"{month[:4]}-{next_month}-01", "%Y-%m-%d")
-        
-        date_filter = and_(
-            Transaction.user_id == current_user_id,
-            Transaction.date >= start_date,
-            Transaction.date < end_date
+async def build_summary_report(db: AsyncSession, user_id: int, month: Optional[str]) -> ReportSummaryResponse:
+    """Compute the income/expense summary for a normalized YYYY-MM month (or all time)"""
+    # Read the pre-aggregated monthly rollups instead of scanning transactions
+    query = select(
+        TransactionMonthlyRollup.type,
+        TransactionMonthlyRollup.category,
+        func.sum(TransactionMonthlyRollup.total).label("total")
+    ).where(
+        and_(
+            TransactionMonthlyRollup.user_id == user_id,
+            TransactionMonthlyRollup.count > 0
         )
+    )
+    if month:
+        query = query.where(TransactionMonthlyRollup.month == month)
     
-    # Calculate total income
-    income_result = db.query(func.sum(Transaction.amount)).filter(
-        and_(date_filter, Transaction.type == "income")
-    ).scalar()
-    income = income_result or 0.0
+    rows = (await db.execute(
+        query.group_by(TransactionMonthlyRollup.type, TransactionMonthlyRollup.category)
+    )).all()
     
-    # Calculate total expenses
-    expense_result = db.query(func.sum(Transaction.amount)).filter(
-        and_(date_filter, Transaction.type == "expense")
-    ).scalar()
-    expense = expense_result or 0.0
+    income = sum(row.total for row in rows if row.type == "income")
+    expense = sum(row.total for row in rows if row.type == "expense")
     
     # Calculate savings
     savings = income - expense
     
-    # Get category breakdown for expenses
-    category_results = db.query(
-        Transaction.category,
-        func.sum(Transaction.amount).label('total')
-    ).filter(
-        and_(date_filter, Transaction.type == "expense")
-    ).group_by(Transaction.category).all()
-    
     categories = [
         CategorySummary(category=row.category, total=row.total)
-        for row in category_results
+        for row in rows if row.type == "expense"
     ]
     
     return ReportSummaryResponse(
@@ -76,62 +53,133 @@ async def get_summary_report(
         categories=categories
     )
 
-@router.get("/trend", response_model=TrendReportResponse)
-async def get_trend_report(
-    months: int = Query(6, description="Number of months to include in trend"),
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+@router.get("/summary", response_model=ReportSummaryResponse)
+async def get_summary_report(
+    month: Optional[str] = Query(None, description="Month in YYYY-MM format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    data_version: Optional[int] = Depends(user_etag(get_current_user_id))
 ):
-    """Get trend data for the specified number of months"""
-    trend_data = []
-    
-    # Get current date and calculate start date
-    current_date = datetime.now()
-    start_date = current_date.replace(day=1) - timedelta(days=months * 30)
-    
-    # Generate data for each month
-    for i in range(months):
-        # Calculate month date
-        month_date = start_date + timedelta(days=i * 30)
-        month_str = month_date.strftime("%Y-%m")
-        
-        # Calculate start and end of month
-        month_start = month_date.replace(day=1)
-        if month_start.month == 12:
-            month_end = month_start.replace(year=month_start.year + 1, month=1)
-        else:
-            month_end = month_start.replace(month=month_start.month + 1)
-        
-        # Calculate income for the month
-        income_result = db.query(func.sum(Transaction.amount)).filter(
-            and_(
-                Transaction.user_id == current_user_id,
-                Transaction.type == "income",
-                Transaction.date >= month_start,
-                Transaction.date < month_end
-            )
-        ).scalar()
-        income = income_result or 0.0
-        
-        # Calculate expenses for the month
-        expense_result = db.query(func.sum(Transaction.amount)).filter(
-            and_(
-                Transaction.user_id == current_user_id,
-                Transaction.type == "expense",
-                Transaction.date >= month_start,
-                Transaction.date < month_end
+    """Get summary report for income, expenses, and savings"""
+    if month:
+        month = parse_month(month).strftime("%Y-%m")
+    return await response_cache.get_or_compute(
+        "reports", current_user_id, {"report": "summary", "month": month},
+        lambda session: build_summary_report(session, current_user_id, month), db,
+        version=data_version
+    )
+
+MAX_TREND_BUCKETS = 1000
+
+async def build_trend_report(
+    db: AsyncSession,
+    user_id: int,
+    granularity: str,
+    start_date: datetime,
+    end_date: datetime
+) -> TrendReportResponse:
+    """Compute income/expense per bucket for the [start_date, end_date) window"""
+    buckets = []
+    bucket = truncate_date(start_date, granularity)
+    while bucket < end_date:
+        buckets.append(bucket)
+        if len(buckets) > MAX_TREND_BUCKETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Trend may contain at most {MAX_TREND_BUCKETS} buckets"
             )
-        ).scalar()
-        expense = expense_result or 0.0
+        bucket = next_period(bucket, granularity)
+    
+    month_aligned = start_date.day == 1 and end_date.day == 1
+    if granularity in ("month", "quarter", "year") and month_aligned:
+        # Whole months can be answered from the monthly rollups
+        rows = await db.execute(
+            select(
+                TransactionMonthlyRollup.month,
+                TransactionMonthlyRollup.type,
+                func.sum(TransactionMonthlyRollup.total).label("total")
+            ).where(
+                and_(
+                    TransactionMonthlyRollup.user_id == user_id,
+                    TransactionMonthlyRollup.month >= start_date.strftime("%Y-%m"),
+                    TransactionMonthlyRollup.month < end_date.strftime("%Y-%m")
+                )
+            ).group_by(TransactionMonthlyRollup.month, TransactionMonthlyRollup.type)
+        )
         
-        # Calculate savings
-        savings = income - expense
+        totals = {}
+        for row in rows:
+            key = truncate_date(parse_month(row.month), granularity)
+            income, expense = totals.get(key, (0.0, 0.0))
+            if row.type == "income":
+                income += row.total
+            elif row.type == "expense":
+                expense += row.total
+            totals[key] = (income, expense)
+    else:
+        # One grouped scan with conditional aggregation for both series
+        bucket_column = date_bucket(granularity, Transaction.date)
+        rows = await db.execute(
+            select(
+                bucket_column.label("bucket"),
+                func.sum(case((Transaction.type == "income", Transaction.amount), else_=0.0)).label("income"),
+                func.sum(case((Transaction.type == "expense", Transaction.amount), else_=0.0)).label("expense")
+            ).where(
+                and_(
+                    Transaction.user_id == user_id,
+                    Transaction.date >= start_date,
+                    Transaction.date < end_date
+                )
+            ).group_by(bucket_column)
+        )
         
-        trend_data.append({
-            "month": month_str,
-            "income": income,
-            "expense": expense,
-            "savings": savings
-        })
+        totals = {}
+        for row in rows:
+            key = row.bucket
+            if isinstance(key, str):
+                key = datetime.fromisoformat(key)
+            totals[key.replace(tzinfo=None)] = (row.income or 0.0, row.expense or 0.0)
+    
+    trend_data = []
+    for bucket in buckets:
+        income, expense = totals.get(bucket, (0.0, 0.0))
+        trend_data.append(TrendDataPoint(
+            month=bucket.strftime("%Y-%m"),
+            period=period_label(bucket, granularity),
+            income=income,
+            expense=expense,
+            savings=income - expense
+        ))
+    
+    return TrendReportResponse(granularity=granularity, trend_data=trend_data)
+
+@router.get("/trend", response_model=TrendReportResponse)
+async def get_trend_report(
+    months: int = Query(6, ge=1, le=120, description="Number of months to include when start is not given"),
+    granularity: str = Query("month", pattern="^(day|week|month|quarter|year)$", description="Bucket size"),
+    start: Optional[date] = Query(None, description="First day to include (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="Last day to include (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id),
+    data_version: Optional[int] = Depends(user_etag(get_current_user_id))
+):
+    """Get income/expense trend data bucketed by the requested granularity"""
+    # By default the trend covers the full months leading up to the current one
+    current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    start_date = datetime.combine(start, time.min) if start else add_months(current_month, -months)
+    end_date = datetime.combine(end, time.min) + timedelta(days=1) if end else current_month
+    if start_date >= end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
     
-    return TrendReportResponse(trend_data=trend_data)
+    params = {
+        "report": "trend", "granularity": granularity,
+        "start": start_date.isoformat(), "end": end_date.isoformat()
+    }
+    return await response_cache.get_or_compute(
+        "reports", current_user_id, params,
+        lambda session: build_trend_report(session, current_user_id, granularity, start_date, end_date), db,
+        version=data_version
+    )
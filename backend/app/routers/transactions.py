@@ -1,36 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, tuple_, select, insert, update, delete
+from pydantic import ValidationError
+from datetime import datetime, timezone
 from typing import Optional
-from ..db import get_db
+import csv
+import hashlib
+import io
+import json
+from ..db import get_async_db, AsyncSessionLocal
 from ..models import Transaction, User
-from ..schemas import TransactionCreate, TransactionUpdate, TransactionResponse
-from ..auth import verify_token
+from ..schemas import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, TransactionPageResponse,
+    TransactionImportResponse, ImportRowError, TransactionBatchRequest,
+    TransactionBatchResponse, TransactionBatchItemResult
+)
+from ..auth import get_current_user_id
+from ..etag import bump_user_version, user_etag
+from ..cache import response_cache, TRANSACTION_VIEWS
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.rollups import add_delta, add_transaction, apply_rollup_deltas
+from ..events import event_broker, user_topic
 
 router = APIRouter()
-security = HTTPBearer()
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """Extract user ID from JWT token"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    return int(payload["sub"])
+def publish_transaction(user_id: int, type: str, transaction: Transaction):
+    """Push a committed transaction change to the owner's live connections"""
+    event_broker.publish(
+        user_topic(user_id), type,
+        {"transaction": TransactionResponse.model_validate(transaction).model_dump(mode="json")},
+        key=transaction.id
+    )
 
-@router.get("/", response_model=list[TransactionResponse])
-async def get_transactions(
-    start: Optional[str] = Query(None, description="Start date (ISO format)"),
-    end: Optional[str] = Query(None, description="End date (ISO format)"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
-    db: Session = Depends(get_db),
-    current_user_id: int = Depends(get_current_user_id)
+def apply_transaction_filters(
+    query,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    category: Optional[str] = None,
+    type: Optional[str] = None
 ):
-    """Get transactions with optional filters"""
-    query = db.query(Transaction).filter(Transaction.user_id == current_user_id)
-    
-    # Apply filters
+    """Apply the shared start/end/category/type filters to a transaction query"""
     if start:
         start_date = datetime.fromisoformat(start.replace('Z', '+00:00'))
         query = query.filter(Transaction.date >= start_date)
@@ -45,13 +55,387 @@ async def get_transactions(
     if type:
         query = query.filter(Transaction.type == type)
     
-    transactions = query.order_by(Transaction.date.desc()).all()
-    return transactions
+    return query
+
+@router.get("/", response_model=TransactionPageResponse, dependencies=[Depends(user_etag(get_current_user_id))])
+async def get_transactions(
+    start: Optional[str] = Query(None, description="Start date (ISO format)"),
+    end: Optional[str] = Query(None, description="End date (ISO format)"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of transactions to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Get a page of transactions with optional filters, newest first"""
+    query = select(Transaction).where(Transaction.user_id == current_user_id)
+    query = apply_transaction_filters(query, start, end, category, type)
+    
+    # Seek past the last row of the previous page instead of using OFFSET
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, cursor_id)
+        )
+    
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.scalars(
+        query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit + 1)
+    )).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    
+    return TransactionPageResponse(items=rows, next_cursor=next_cursor)
+
+EXPORT_COLUMNS = ["id", "date", "type", "category", "description", "amount", "created_at"]
+EXPORT_BATCH_SIZE = 1000
+
+def _export_row(transaction: Transaction) -> dict:
+    return {
+        "id": transaction.id,
+        "date": transaction.date.isoformat() if transaction.date else None,
+        "type": transaction.type,
+        "category": transaction.category,
+        "description": transaction.description,
+        "amount": transaction.amount,
+        "created_at": transaction.created_at.isoformat() if transaction.created_at else None
+    }
+
+async def _stream_export(
+    current_user_id: int,
+    format: str,
+    start: Optional[str],
+    end: Optional[str],
+    category: Optional[str],
+    type: Optional[str]
+):
+    """Yield export chunks while reading rows through a server-side cursor"""
+    # The session is owned by the generator so it stays open for the whole stream
+    async with AsyncSessionLocal() as db:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        if format == "csv":
+            writer.writeheader()
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        
+        query = select(Transaction).where(Transaction.user_id == current_user_id)
+        query = apply_transaction_filters(query, start, end, category, type)
+        query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+        rows = await db.stream_scalars(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        
+        pending = 0
+        async for transaction in rows:
+            row = _export_row(transaction)
+            if format == "csv":
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(row))
+                buffer.write("\n")
+            pending += 1
+            if pending >= EXPORT_BATCH_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+
+@router.get("/export")
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format (csv/ndjson)"),
+    start: Optional[str] = Query(None, description="Start date (ISO format)"),
+    end: Optional[str] = Query(None, description="End date (ISO format)"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Stream all matching transactions as CSV or NDJSON"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_export(current_user_id, format, start, end, category, type),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+    )
+
+TRANSACTION_TYPES = ("income", "expense")
+
+def _naive_utc(date: datetime) -> datetime:
+    """Drop a timezone offset by converting to UTC, so aware and naive dates compare"""
+    if date.tzinfo is not None:
+        return date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date
+
+def _content_hash(date: datetime, amount: float, description: str) -> str:
+    """Hash the (date, amount, description) triple used to detect duplicate imports"""
+    date = _naive_utc(date)
+    key = f"{date.isoformat()}|{amount:.2f}|{description.strip().lower()}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def _format_validation_error(e: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single 'field: message' line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in e.errors()
+    )
+
+def _parse_import_file(filename: str, content: bytes) -> list:
+    """Parse an uploaded CSV or JSON file into a list of raw row dicts"""
+    text = content.decode("utf-8-sig")
+    if filename.lower().endswith(".json"):
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be a list of transactions")
+        return rows
+    return list(csv.DictReader(io.StringIO(text)))
+
+IMPORT_COLUMNS = ["user_id", "amount", "description", "category", "type", "date"]
+
+async def _insert_imported_rows(db: AsyncSession, rows: list):
+    """Load validated rows with COPY on PostgreSQL, multi-row INSERT elsewhere"""
+    if db.bind.dialect.name == "postgresql":
+        # COPY runs on the asyncpg connection underneath this session's transaction
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "transactions",
+            records=[tuple(row[column] for column in IMPORT_COLUMNS) for row in rows],
+            columns=IMPORT_COLUMNS
+        )
+    else:
+        await db.execute(insert(Transaction), rows)
+
+@router.post("/import", response_model=TransactionImportResponse)
+async def import_transactions(
+    file: UploadFile = File(..., description="CSV or JSON file of transactions"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Bulk import transactions, skipping rows that already exist"""
+    try:
+        raw_rows = _parse_import_file(file.filename or "", await file.read())
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not parse import file: {e}"
+        )
+    
+    # Validate every row in one pass, collecting errors instead of failing fast
+    errors = []
+    valid = []
+    for index, raw in enumerate(raw_rows, start=1):
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError("row must be an object")
+            # Bank statements usually carry plain dates without a time part
+            if isinstance(raw.get("date"), str) and len(raw["date"]) == 10:
+                raw = {**raw, "date": f"{raw['date']}T00:00:00"}
+            data = TransactionCreate(**raw)
+            if data.type not in TRANSACTION_TYPES:
+                raise ValueError("type must be 'income' or 'expense'")
+            # Files may mix plain and offset dates; store and compare them all as naive UTC
+            data.date = _naive_utc(data.date)
+        except ValidationError as e:
+            errors.append(ImportRowError(row=index, detail=_format_validation_error(e)))
+            continue
+        except ValueError as e:
+            errors.append(ImportRowError(row=index, detail=str(e)))
+            continue
+        valid.append(data)
+    
+    # Hash existing rows in the imported date window once, then dedupe in memory
+    seen = set()
+    if valid:
+        dates = [data.date for data in valid]
+        existing = await db.execute(
+            select(
+                Transaction.date, Transaction.amount, Transaction.description
+            ).where(
+                and_(
+                    Transaction.user_id == current_user_id,
+                    Transaction.date >= min(dates),
+                    Transaction.date <= max(dates)
+                )
+            )
+        )
+        seen = {_content_hash(row.date, row.amount, row.description) for row in existing}
+    
+    rows = []
+    duplicates = 0
+    for data in valid:
+        digest = _content_hash(data.date, data.amount, data.description)
+        if digest in seen:
+            duplicates += 1
+            continue
+        seen.add(digest)
+        rows.append({"user_id": current_user_id, **data.dict()})
+    
+    if rows:
+        await _insert_imported_rows(db, rows)
+        deltas = {}
+        for row in rows:
+            add_delta(deltas, current_user_id, row["date"], row["type"], row["category"], row["amount"], 1)
+        await apply_rollup_deltas(db, deltas)
+        await bump_user_version(db, current_user_id)
+        await db.commit()
+        response_cache.invalidate(current_user_id, *TRANSACTION_VIEWS)
+        event_broker.publish(user_topic(current_user_id), "transactions.changed", {"reason": "import"})
+    
+    return TransactionImportResponse(
+        imported=len(rows),
+        duplicates=duplicates,
+        errors=errors
+    )
+
+MAX_BATCH_OPERATIONS = 1000
+
+@router.post("/batch", response_model=TransactionBatchResponse)
+async def batch_transactions(
+    batch: TransactionBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Apply a list of create/update/delete operations in one DB transaction"""
+    if len(batch.operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {MAX_BATCH_OPERATIONS} operations"
+        )
+    
+    results = [
+        TransactionBatchItemResult(index=index, op=operation.op, status="ok", id=operation.id)
+        for index, operation in enumerate(batch.operations)
+    ]
+    
+    def fail(index: int, detail: str):
+        results[index].status = "error"
+        results[index].detail = detail
+    
+    # Validate everything up front and bucket operations by kind
+    creates = []
+    updates = {}
+    deletes = []
+    touched_ids = set()
+    for index, operation in enumerate(batch.operations):
+        try:
+            if operation.op == "create":
+                creates.append((index, TransactionCreate(**(operation.data or {}))))
+                continue
+            if operation.op not in ("update", "delete"):
+                raise ValueError("op must be 'create', 'update' or 'delete'")
+            if operation.id is None:
+                raise ValueError("id is required")
+            if operation.id in touched_ids:
+                raise ValueError("id appears more than once in this batch")
+            touched_ids.add(operation.id)
+            if operation.op == "update":
+                update_data = TransactionUpdate(**(operation.data or {})).dict(exclude_unset=True)
+                if not update_data:
+                    raise ValueError("no fields to update")
+                # Every updatable column is NOT NULL; an explicit null would fail the whole batch at the database
+                nulls = sorted(field for field, value in update_data.items() if value is None)
+                if nulls:
+                    raise ValueError(f"{', '.join(nulls)} may not be null")
+                # Identical payloads collapse into a single set-based UPDATE
+                key = tuple(sorted(update_data.items()))
+                updates.setdefault(key, []).append((index, operation.id))
+            else:
+                deletes.append((index, operation.id))
+        except ValidationError as e:
+            fail(index, _format_validation_error(e))
+        except ValueError as e:
+            fail(index, str(e))
+    
+    if any(result.status == "error" for result in results):
+        return TransactionBatchResponse(committed=False, results=results)
+    
+    deltas = {}
+    if creates:
+        created = (await db.scalars(
+            # Rows are matched to request items by position, so RETURNING must keep parameter order
+            insert(Transaction).returning(Transaction, sort_by_parameter_order=True),
+            [{"user_id": current_user_id, **data.dict()} for _, data in creates]
+        )).all()
+        for (index, _), transaction in zip(creates, created):
+            results[index].id = transaction.id
+            results[index].transaction = TransactionResponse.model_validate(transaction)
+            add_transaction(deltas, transaction)
+    
+    if updates:
+        # Lock and read the pre-update rows so their rollup contribution can be removed
+        update_ids = [transaction_id for items in updates.values() for _, transaction_id in items]
+        previous = await db.execute(
+            select(
+                Transaction.user_id, Transaction.date, Transaction.type,
+                Transaction.category, Transaction.amount
+            ).where(
+                and_(Transaction.user_id == current_user_id, Transaction.id.in_(update_ids))
+            ).with_for_update()
+        )
+        for transaction in previous:
+            add_transaction(deltas, transaction, sign=-1)
+    
+    for key, items in updates.items():
+        ids = [transaction_id for _, transaction_id in items]
+        updated = (await db.scalars(
+            update(Transaction)
+            .where(and_(Transaction.user_id == current_user_id, Transaction.id.in_(ids)))
+            .values(**dict(key))
+            .returning(Transaction)
+            .execution_options(synchronize_session=False)
+        )).all()
+        by_id = {transaction.id: transaction for transaction in updated}
+        for transaction in updated:
+            add_transaction(deltas, transaction)
+        for index, transaction_id in items:
+            if transaction_id in by_id:
+                results[index].transaction = TransactionResponse.model_validate(by_id[transaction_id])
+            else:
+                fail(index, "Transaction not found")
+    
+    if deletes:
+        ids = [transaction_id for _, transaction_id in deletes]
+        removed = (await db.execute(
+            delete(Transaction)
+            .where(and_(Transaction.user_id == current_user_id, Transaction.id.in_(ids)))
+            .returning(
+                Transaction.id, Transaction.user_id, Transaction.date,
+                Transaction.type, Transaction.category, Transaction.amount
+            )
+            .execution_options(synchronize_session=False)
+        )).all()
+        deleted = set()
+        for transaction in removed:
+            deleted.add(transaction.id)
+            add_transaction(deltas, transaction, sign=-1)
+        for index, transaction_id in deletes:
+            if transaction_id not in deleted:
+                fail(index, "Transaction not found")
+    
+    # All-or-nothing: one missing row rolls back the whole batch
+    if any(result.status == "error" for result in results):
+        await db.rollback()
+        for result in results:
+            result.transaction = None
+        return TransactionBatchResponse(committed=False, results=results)
+    
+    await apply_rollup_deltas(db, deltas)
+    await bump_user_version(db, current_user_id)
+    await db.commit()
+    response_cache.invalidate(current_user_id, *TRANSACTION_VIEWS)
+    event_broker.publish(user_topic(current_user_id), "transactions.changed", {"reason": "batch"})
+    return TransactionBatchResponse(committed=True, results=results)
 
 @router.post("/", response_model=TransactionResponse)
 async def create_transaction(
     transaction_data: TransactionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Create a new transaction"""
@@ -61,8 +445,14 @@ async def create_transaction(
     )
     
     db.add(db_transaction)
-    db.commit()
-    db.refresh(db_transaction)
+    deltas = {}
+    add_transaction(deltas, db_transaction)
+    await apply_rollup_deltas(db, deltas)
+    await bump_user_version(db, current_user_id)
+    await db.commit()
+    response_cache.invalidate(current_user_id, *TRANSACTION_VIEWS)
+    await db.refresh(db_transaction)
+    publish_transaction(current_user_id, "transaction.created", db_transaction)
     
     return db_transaction
 
@@ -70,13 +460,15 @@ async def create_transaction(
 async def update_transaction(
     transaction_id: int,
     transaction_data: TransactionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Update a transaction"""
-    db_transaction = db.query(Transaction).filter(
-        and_(Transaction.id == transaction_id, Transaction.user_id == current_user_id)
-    ).first()
+    db_transaction = await db.scalar(
+        select(Transaction).where(
+            and_(Transaction.id == transaction_id, Transaction.user_id == current_user_id)
+        ).with_for_update()
+    )
     
     if not db_transaction:
         raise HTTPException(
@@ -84,26 +476,36 @@ async def update_transaction(
             detail="Transaction not found"
         )
     
+    deltas = {}
+    add_transaction(deltas, db_transaction, sign=-1)
+    
     # Update only provided fields
     update_data = transaction_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_transaction, field, value)
     
-    db.commit()
-    db.refresh(db_transaction)
+    add_transaction(deltas, db_transaction)
+    await apply_rollup_deltas(db, deltas)
+    await bump_user_version(db, current_user_id)
+    await db.commit()
+    response_cache.invalidate(current_user_id, *TRANSACTION_VIEWS)
+    await db.refresh(db_transaction)
+    publish_transaction(current_user_id, "transaction.updated", db_transaction)
     
     return db_transaction
 
 @router.delete("/{transaction_id}")
 async def delete_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Delete a transaction"""
-    db_transaction = db.query(Transaction).filter(
-        and_(Transaction.id == transaction_id, Transaction.user_id == current_user_id)
-    ).first()
+    db_transaction = await db.scalar(
+        select(Transaction).where(
+            and_(Transaction.id == transaction_id, Transaction.user_id == current_user_id)
+        ).with_for_update()
+    )
     
     if not db_transaction:
         raise HTTPException(
@@ -111,7 +513,15 @@ async def delete_transaction(
             detail="Transaction not found"
         )
     
-    db.delete(db_transaction)
-    db.commit()
+    deltas = {}
+    add_transaction(deltas, db_transaction, sign=-1)
+    await apply_rollup_deltas(db, deltas)
+    await db.delete(db_transaction)
+    await bump_user_version(db, current_user_id)
+    await db.commit()
+    response_cache.invalidate(current_user_id, *TRANSACTION_VIEWS)
+    event_broker.publish(
+        user_topic(current_user_id), "transaction.deleted", {"id": transaction_id}, key=transaction_id
+    )
     
     return {"message": "Transaction deleted successfully"}
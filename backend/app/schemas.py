@@ -52,6 +52,39 @@ class TransactionResponse(TransactionBase):
     class Config:
         from_attributes = True
 
+class TransactionPageResponse(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    detail: str
+
+class TransactionImportResponse(BaseModel):
+    imported: int
+    duplicates: int
+    errors: List[ImportRowError]
+
+class TransactionBatchOperation(BaseModel):
+    op: str  # 'create', 'update' or 'delete'
+    id: Optional[int] = None
+    data: Optional[Dict[str, Any]] = None
+
+class TransactionBatchRequest(BaseModel):
+    operations: List[TransactionBatchOperation]
+
+class TransactionBatchItemResult(BaseModel):
+    index: int
+    op: str
+    status: str  # 'ok' or 'error'
+    id: Optional[int] = None
+    detail: Optional[str] = None
+    transaction: Optional[TransactionResponse] = None
+
+class TransactionBatchResponse(BaseModel):
+    committed: bool
+    results: List[TransactionBatchItemResult]
+
 # Budget schemas
 class BudgetBase(BaseModel):
     category: str
@@ -75,6 +108,20 @@ class BudgetUsageResponse(BaseModel):
     spent: float
     remaining: float
 
+class BudgetUsageCell(BaseModel):
+    month: str
+    limit: Optional[float] = None  # None when no budget was set for that month
+    spent: float
+    remaining: Optional[float] = None
+
+class BudgetCategoryUsage(BaseModel):
+    category: str
+    months: List[BudgetUsageCell]
+
+class BudgetUsageMatrixResponse(BaseModel):
+    months: List[str]
+    categories: List[BudgetCategoryUsage]
+
 # Group schemas
 class GroupBase(BaseModel):
     name: str
@@ -91,6 +138,12 @@ class GroupResponse(GroupBase):
     class Config:
         from_attributes = True
 
+class GroupSummaryResponse(GroupResponse):
+    member_count: int
+    total_spent: float
+    last_activity_at: datetime
+    my_balance: float  # positive: the group owes the caller
+
 class GroupMemberResponse(BaseModel):
     id: int
     user: UserResponse
@@ -136,6 +189,30 @@ class SettlementResponse(SettlementBase):
     class Config:
         from_attributes = True
 
+# Group activity feed schemas
+class GroupExpenseSplitResponse(BaseModel):
+    user_id: int
+    weight: float
+    owed_amount: float
+    
+    class Config:
+        from_attributes = True
+
+class GroupActivityItem(BaseModel):
+    type: str  # 'expense' or 'settlement'
+    id: int
+    occurred_at: datetime  # expense date, or when the settlement was recorded
+    amount: float
+    description: Optional[str] = None
+    category: Optional[str] = None  # expenses only
+    user_id: int  # who paid: the expense payer or the settling member
+    to_user_id: Optional[int] = None  # settlements only
+    splits: Optional[List[GroupExpenseSplitResponse]] = None  # expenses only
+
+class GroupActivityPageResponse(BaseModel):
+    items: List[GroupActivityItem]
+    next_cursor: Optional[str] = None
+
 # Balance schemas
 class UserBalance(BaseModel):
     user_id: int
@@ -176,10 +253,39 @@ class TransactionCategoriesResponse(BaseModel):
 
 # Trend schemas
 class TrendDataPoint(BaseModel):
-    month: str
+    month: str  # YYYY-MM of the bucket start, kept for older clients
+    period: str  # bucket label for the requested granularity
     income: float
     expense: float
     savings: float
 
 class TrendReportResponse(BaseModel):
+    granularity: str
     trend_data: List[TrendDataPoint]
+
+class DashboardBundleResponse(BaseModel):
+    overview: DashboardOverviewResponse
+    budget_usage: List[BudgetUsageResponse]
+    summary: ReportSummaryResponse
+    trend: TrendReportResponse
+
+# Batch schemas
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None  # echoed back so clients can match responses
+    method: str = "GET"
+    path: str  # e.g. /api/reports/summary; may carry its own query string
+    params: Optional[Dict[str, Any]] = None
+    body: Optional[Any] = None
+    headers: Optional[Dict[str, str]] = None  # e.g. If-None-Match
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
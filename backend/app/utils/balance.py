@@ -1,89 +1,141 @@
-from typing import List, Dict, Any
-from ..schemas import UserBalance, SettlementSuggestion
+import time
+from typing import List, Dict, Optional, Tuple
+from ..schemas import SettlementSuggestion
 
-def calculate_group_balances(expenses: List[Dict[str, Any]], users: List[Dict[str, Any]]) -> tuple[List[UserBalance], List[SettlementSuggestion]]:
+# Bitmask DP is exact but O(2^n * n); beyond this many non-zero members use the heuristic
+EXACT_SOLVER_MAX_MEMBERS = 20
+# Wall-clock budget for the exact solver before falling back to the heuristic
+EXACT_SOLVER_TIME_BUDGET = 0.25  # seconds
+
+def calculate_minimal_settlements(
+    balances: Dict[int, float],
+    user_names: Dict[int, str],
+    time_budget: float = EXACT_SOLVER_TIME_BUDGET
+) -> List[SettlementSuggestion]:
     """
-    Calculate balances for each user in a group and suggest minimal settlements.
-    
-    Args:
-        expenses: List of group expenses with splits
-        users: List of users in the group
+    Calculate the minimal number of transactions needed to settle all debts.
     
-    Returns:
-        Tuple of (user_balances, settlement_suggestions)
+    Every set of members whose balances sum to zero can settle among
+    themselves in (size - 1) transfers, so the fewest transfers overall comes
+    from splitting members into as many zero-sum groups as possible. Small
+    groups are solved exactly with a bitmask DP; large ones (or ones that run
+    past the time budget) use a pair-cancelling greedy heuristic.
     """
-    # Initialize balances for each user
-    balances = {user['id']: 0.0 for user in users}
-    user_names = {user['id']: user['name'] for user in users}
+    cents = _to_cents(balances)
     
-    # Calculate what each user owes vs what they paid
-    for expense in expenses:
-        paid_by = expense['paid_by_user_id']
-        amount = expense['amount']
-        splits = expense['splits']
-        
-        # Calculate total weight for normalization
-        total_weight = sum(split['weight'] for split in splits)
-        
-        # Add to what the payer paid
-        balances[paid_by] += amount
-        
-        # Subtract what each user owes based on their weight
-        for split in splits:
-            user_id = split['user_id']
-            weight = split['weight']
-            owed_amount = (weight / total_weight) * amount
-            balances[user_id] -= owed_amount
+    # Exactly opposite balances always settle in one transfer, in some optimal solution
+    groups, remaining = _cancel_opposite_pairs(cents)
     
-    # Convert to UserBalance objects
-    user_balances = [
-        UserBalance(user_id=user_id, user_name=user_names[user_id], balance=balance)
-        for user_id, balance in balances.items()
-    ]
+    exact = None
+    if len(remaining) <= EXACT_SOLVER_MAX_MEMBERS:
+        exact = _max_zero_sum_groups(remaining, time.perf_counter() + time_budget)
+    if exact is not None:
+        groups.extend(exact)
+    elif remaining:
+        groups.append(remaining)
     
-    # Calculate minimal settlements
-    settlements = calculate_minimal_settlements(balances, user_names)
+    transfers = []
+    for group in groups:
+        transfers.extend(_settle_group(group))
     
-    return user_balances, settlements
+    return [
+        SettlementSuggestion(from_user_id=debtor_id, to_user_id=creditor_id, amount=amount / 100)
+        for debtor_id, creditor_id, amount in transfers
+    ]
 
-def calculate_minimal_settlements(balances: Dict[int, float], user_names: Dict[int, str]) -> List[SettlementSuggestion]:
-    """
-    Calculate the minimal number of transactions needed to settle all debts.
-    Uses a greedy algorithm to minimize the number of transactions.
-    """
-    # Separate creditors (positive balance) and debtors (negative balance)
-    creditors = [(user_id, balance) for user_id, balance in balances.items() if balance > 0]
-    debtors = [(user_id, -balance) for user_id, balance in balances.items() if balance < 0]
-    
-    # Sort by amount (largest first)
-    creditors.sort(key=lambda x: x[1], reverse=True)
-    debtors.sort(key=lambda x: x[1], reverse=True)
+def _to_cents(balances: Dict[int, float]) -> List[Tuple[int, int]]:
+    """Round balances to whole cents, absorbing rounding drift so they sum to zero"""
+    cents = [(user_id, round(balance * 100)) for user_id, balance in balances.items()]
+    drift = sum(amount for _, amount in cents)
+    if drift and cents:
+        # Give the leftover cent(s) to the largest balance, where they matter least
+        index = max(range(len(cents)), key=lambda i: abs(cents[i][1]))
+        cents[index] = (cents[index][0], cents[index][1] - drift)
+    return [(user_id, amount) for user_id, amount in cents if amount]
+
+def _cancel_opposite_pairs(cents: List[Tuple[int, int]]) -> Tuple[List[list], List[Tuple[int, int]]]:
+    """Pair up members with exactly opposite balances"""
+    waiting = {}
+    pairs = []
+    for user_id, amount in cents:
+        partners = waiting.get(-amount)
+        if partners:
+            pairs.append([partners.pop(), (user_id, amount)])
+        else:
+            waiting.setdefault(amount, []).append((user_id, amount))
+    remaining = [member for members in waiting.values() for member in members]
+    return pairs, remaining
+
+def _max_zero_sum_groups(members: List[Tuple[int, int]], deadline: float) -> Optional[List[list]]:
+    """Partition members into the most zero-sum groups, or None if the deadline passes"""
+    n = len(members)
+    if n == 0:
+        return []
+    amounts = [amount for _, amount in members]
+    full = (1 << n) - 1
+    sums = [0] * (full + 1)
+    # best[mask]: most zero-sum prefixes over any ordering of the members in mask
+    best = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        if not mask & 4095 and time.perf_counter() > deadline:
+            return None
+        low = mask & -mask
+        total = sums[mask ^ low] + amounts[low.bit_length() - 1]
+        sums[mask] = total
+        top = 0
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            if best[mask ^ bit] > top:
+                top = best[mask ^ bit]
+            rest ^= bit
+        best[mask] = top + (total == 0)
     
-    settlements = []
-    i = j = 0
+    # Walk back through an optimal ordering; members between zero-sum prefixes form a group
+    groups = []
+    group = []
+    mask = full
+    while mask:
+        target = best[mask] - (sums[mask] == 0)
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            if best[mask ^ bit] == target:
+                break
+            rest ^= bit
+        group.append(members[bit.bit_length() - 1])
+        mask ^= bit
+        if sums[mask] == 0:
+            groups.append(group)
+            group = []
+    return groups
+
+def _settle_group(members: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+    """Settle a zero-sum group in at most (size - 1) transfers of whole cents"""
+    creditors = sorted(((amount, user_id) for user_id, amount in members if amount > 0), reverse=True)
+    debtors = sorted(((-amount, user_id) for user_id, amount in members if amount < 0), reverse=True)
     
-    while i < len(creditors) and j < len(debtors):
-        creditor_id, creditor_amount = creditors[i]
-        debtor_id, debtor_amount = debtors[j]
-        
-        # Calculate settlement amount
-        settlement_amount = min(creditor_amount, debtor_amount)
-        
-        if settlement_amount > 0.01:  # Only settle if amount is significant
-            settlements.append(SettlementSuggestion(
-                from_user_id=debtor_id,
-                to_user_id=creditor_id,
-                amount=round(settlement_amount, 2)
-            ))
-        
-        # Update amounts
-        creditors[i] = (creditor_id, creditor_amount - settlement_amount)
-        debtors[j] = (debtor_id, debtor_amount - settlement_amount)
-        
-        # Move to next creditor/debtor if current one is settled
-        if creditors[i][1] < 0.01:
-            i += 1
-        if debtors[j][1] < 0.01:
-            j += 1
+    # Prefer a creditor owed exactly what the debtor owes; each such match clears two members
+    open_credits = {}
+    for amount, user_id in creditors:
+        open_credits.setdefault(amount, []).append(user_id)
     
-    return settlements
+    transfers = []
+    credit = {user_id: amount for amount, user_id in creditors}
+    for debt, debtor_id in debtors:
+        while debt > 0:
+            matches = open_credits.get(debt)
+            if matches:
+                creditor_id = matches.pop()
+            else:
+                creditor_id = max(credit, key=credit.get)
+                open_credits[credit[creditor_id]].remove(creditor_id)
+            amount = min(debt, credit[creditor_id])
+            transfers.append((debtor_id, creditor_id, amount))
+            debt -= amount
+            credit[creditor_id] -= amount
+            if credit[creditor_id]:
+                open_credits.setdefault(credit[creditor_id], []).append(creditor_id)
+            else:
+                del credit[creditor_id]
+    return transfers
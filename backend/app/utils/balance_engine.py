@@ -0,0 +1,31 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from ..config import settings
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn, not fork: forking a process that runs an event loop and DB pools is unsafe
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.BALANCE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+def shutdown_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(cancel_futures=True)
+            _process_pool = None
+
+async def offload(func: Callable[..., Any], *args) -> Any:
+    """Run CPU-bound work in the balance process pool so it doesn't block the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_get_process_pool(), func, *args)
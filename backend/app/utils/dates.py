@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import String, DateTime, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+def parse_month(month: str) -> datetime:
+    """Parse a YYYY-MM string into the first instant of that month"""
+    try:
+        return datetime.strptime(f"{month}-01", "%Y-%m-%d")
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Month must be in YYYY-MM format"
+        )
+
+def add_months(date: datetime, months: int) -> datetime:
+    """Shift a first-of-month datetime by a number of calendar months"""
+    index = date.year * 12 + date.month - 1 + months
+    return date.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+def month_range(month: str) -> Tuple[datetime, datetime]:
+    """Return the [start, end) datetimes covering a YYYY-MM month"""
+    start_date = parse_month(month)
+    return start_date, add_months(start_date, 1)
+
+def months_between(start_month: str, end_month: str) -> List[str]:
+    """List the YYYY-MM months from start_month to end_month inclusive"""
+    current = parse_month(start_month)
+    last = parse_month(end_month)
+    months = []
+    while current <= last:
+        months.append(current.strftime("%Y-%m"))
+        current = add_months(current, 1)
+    return months
+
+class year_month(FunctionElement):
+    """SQL expression formatting a timestamp column as YYYY-MM"""
+    type = String()
+    inherit_cache = True
+
+@compiles(year_month)
+def _year_month_default(element, compiler, **kw):
+    return "to_char(%s, 'YYYY-MM')" % compiler.process(element.clauses, **kw)
+
+@compiles(year_month, "sqlite")
+def _year_month_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m', " + compiler.process(element.clauses, **kw) + ")"
+
+GRANULARITIES = ("day", "week", "month", "quarter", "year")
+
+def truncate_date(date: datetime, granularity: str) -> datetime:
+    """Return the start of the day/week/month/quarter/year bucket containing date"""
+    date = date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return date
+    if granularity == "week":
+        return date - timedelta(days=date.weekday())
+    if granularity == "month":
+        return date.replace(day=1)
+    if granularity == "quarter":
+        return date.replace(month=(date.month - 1) // 3 * 3 + 1, day=1)
+    return date.replace(month=1, day=1)
+
+def next_period(date: datetime, granularity: str) -> datetime:
+    """Return the start of the bucket following the one starting at date"""
+    if granularity == "day":
+        return date + timedelta(days=1)
+    if granularity == "week":
+        return date + timedelta(weeks=1)
+    return add_months(date, {"month": 1, "quarter": 3, "year": 12}[granularity])
+
+def period_label(date: datetime, granularity: str) -> str:
+    """Human-readable label for the bucket starting at date"""
+    if granularity in ("day", "week"):
+        return date.strftime("%Y-%m-%d")
+    if granularity == "month":
+        return date.strftime("%Y-%m")
+    if granularity == "quarter":
+        return f"{date.year}-Q{(date.month - 1) // 3 + 1}"
+    return str(date.year)
+
+class date_bucket(FunctionElement):
+    """SQL expression truncating a timestamp column to a granularity bucket"""
+    type = DateTime()
+    inherit_cache = True
+
+    def __init__(self, granularity: str, column):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        # Kept as a clause so the granularity is part of the statement cache key
+        super().__init__(literal_column(f"'{granularity}'"), column)
+
+@compiles(date_bucket)
+def _date_bucket_default(element, compiler, **kw):
+    return "date_trunc(%s)" % compiler.process(element.clauses, **kw)
+
+@compiles(date_bucket, "sqlite")
+def _date_bucket_sqlite(element, compiler, **kw):
+    granularity_clause, column = element.clauses.clauses
+    granularity = granularity_clause.name.strip("'")
+    column = compiler.process(column, **kw)
+    if granularity == "day":
+        return f"date({column})"
+    if granularity == "week":
+        return f"date({column}, '-6 days', 'weekday 1')"
+    if granularity == "month":
+        return f"strftime('%Y-%m-01', {column})"
+    if granularity == "quarter":
+        return (
+            f"printf('%s-%02d-01', strftime('%Y', {column}), "
+            f"(CAST(strftime('%m', {column}) AS INTEGER) - 1) / 3 * 3 + 1)"
+        )
+    return f"strftime('%Y-01-01', {column})"
@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models import GroupBalance, GroupExpense, GroupExpenseSplit, Settlement
+
+# Ledger entries smaller than this are floating-point noise, not money
+BALANCE_TOLERANCE = 0.005
+
+LedgerKey = Tuple[int, int]  # (group_id, user_id)
+
+def split_weights(splits: List[Dict[str, Any]]) -> List[Tuple[int, float]]:
+    """Validate an expense's splits and return them as (user_id, weight) pairs"""
+    try:
+        weights = [(int(split["user_id"]), float(split["weight"])) for split in splits]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Each split needs a numeric user_id and weight")
+    if any(weight < 0 for _, weight in weights):
+        raise ValueError("Split weights must not be negative")
+    if len({user_id for user_id, _ in weights}) != len(weights):
+        raise ValueError("Each member can only appear once in the splits")
+    if sum(weight for _, weight in weights) <= 0:
+        raise ValueError("Split weights must add up to more than zero")
+    return weights
+
+def expense_shares(amount: float, splits: List[Dict[str, Any]]) -> List[Tuple[int, float, float]]:
+    """Split an expense amount into (user_id, weight, owed_amount) shares by weight"""
+    weights = split_weights(splits)
+    total_weight = sum(weight for _, weight in weights)
+    return [(user_id, weight, weight / total_weight * amount) for user_id, weight in weights]
+
+def expense_split_rows(amount: float, splits: List[Dict[str, Any]]) -> List[GroupExpenseSplit]:
+    """Normalized split rows for a new expense, with each member's share precomputed"""
+    return [
+        GroupExpenseSplit(user_id=user_id, weight=weight, owed_amount=owed_amount)
+        for user_id, weight, owed_amount in expense_shares(amount, splits)
+    ]
+
+def backfill_expense_splits(db: Session) -> int:
+    """
+    Create split rows for expenses saved without them: on SQLite dev databases built
+    from the models, and on PostgreSQL for expenses the previous release wrote while
+    migration 0006 was running.
+    """
+    filled = 0
+    for expense in db.scalars(select(GroupExpense).where(~GroupExpense.split_rows.any())):
+        # Merge members listed twice, as the migration does
+        merged = {}
+        for split in expense.splits or []:
+            if isinstance(split, dict) and "user_id" in split:
+                merged[split["user_id"]] = merged.get(split["user_id"], 0.0) + float(split.get("weight", 0))
+        try:
+            expense.split_rows = expense_split_rows(
+                expense.amount, [{"user_id": user_id, "weight": weight} for user_id, weight in merged.items()]
+            )
+        except (TypeError, ValueError):
+            # Unusable splits get no rows, so only the payer is credited
+            continue
+        filled += 1
+    return filled
+
+def add_expense(deltas: Dict[LedgerKey, float], group_id: int, paid_by_user_id: int, amount: float, split_rows):
+    """Record an expense: the payer is owed the amount, each split member owes their share"""
+    deltas[(group_id, paid_by_user_id)] = deltas.get((group_id, paid_by_user_id), 0.0) + amount
+    for split in split_rows:
+        deltas[(group_id, split.user_id)] = deltas.get((group_id, split.user_id), 0.0) - split.owed_amount
+
+def add_settlement(deltas: Dict[LedgerKey, float], group_id: int, from_user_id: int, to_user_id: int, amount: float):
+    """Record a payment from one member to another, which moves both towards zero"""
+    deltas[(group_id, from_user_id)] = deltas.get((group_id, from_user_id), 0.0) + amount
+    deltas[(group_id, to_user_id)] = deltas.get((group_id, to_user_id), 0.0) - amount
+
+async def apply_balance_deltas(db: AsyncSession, deltas: Dict[LedgerKey, float]):
+    """Upsert accumulated balance changes in one statement, inside the caller's transaction"""
+    # Sorted keys keep lock order stable across concurrent writers
+    rows = [
+        {"group_id": group_id, "user_id": user_id, "balance": balance}
+        for (group_id, user_id), balance in sorted(deltas.items())
+    ]
+    if not rows:
+        return
+
+    dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = dialect_insert(GroupBalance).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["group_id", "user_id"],
+        set_={"balance": GroupBalance.balance + stmt.excluded.balance}
+    )
+    await db.execute(stmt)
+
+def balance_history_query(group_id: Optional[int] = None):
+    """
+    Net balance per (group, member) from history, summed by the database: payers are
+    credited, split members charged their stored share, and settlements move the
+    payer up and the recipient down
+    """
+    credits = select(
+        GroupExpense.group_id, GroupExpense.paid_by_user_id.label("user_id"), GroupExpense.amount.label("delta")
+    )
+    charges = select(
+        GroupExpense.group_id, GroupExpenseSplit.user_id, (-GroupExpenseSplit.owed_amount).label("delta")
+    ).join(GroupExpense, GroupExpense.id == GroupExpenseSplit.expense_id)
+    paid = select(Settlement.group_id, Settlement.from_user_id.label("user_id"), Settlement.amount.label("delta"))
+    received = select(Settlement.group_id, Settlement.to_user_id.label("user_id"), (-Settlement.amount).label("delta"))
+    if group_id is not None:
+        credits = credits.where(GroupExpense.group_id == group_id)
+        charges = charges.where(GroupExpense.group_id == group_id)
+        paid = paid.where(Settlement.group_id == group_id)
+        received = received.where(Settlement.group_id == group_id)
+
+    deltas = union_all(credits, charges, paid, received).subquery()
+    return select(
+        deltas.c.group_id, deltas.c.user_id, func.sum(deltas.c.delta).label("balance")
+    ).group_by(deltas.c.group_id, deltas.c.user_id)
+
+def replay_group_balances(db: Session, group_id: Optional[int] = None) -> Dict[LedgerKey, float]:
+    """Recompute balances from the full expense and settlement history"""
+    return {(row.group_id, row.user_id): row.balance for row in db.execute(balance_history_query(group_id))}
+
+def check_group_balances(db: Session, group_id: Optional[int] = None) -> List[Tuple[LedgerKey, float, float]]:
+    """Compare the ledger with replayed history and return (key, stored, expected) mismatches"""
+    expected = replay_group_balances(db, group_id)
+    stored_query = select(GroupBalance.group_id, GroupBalance.user_id, GroupBalance.balance)
+    if group_id is not None:
+        stored_query = stored_query.where(GroupBalance.group_id == group_id)
+    stored = {(row.group_id, row.user_id): row.balance for row in db.execute(stored_query)}
+
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        if abs(stored.get(key, 0.0) - expected.get(key, 0.0)) > BALANCE_TOLERANCE:
+            mismatches.append((key, stored.get(key, 0.0), expected.get(key, 0.0)))
+    return mismatches
+
+def rebuild_group_balances(db: Session, group_id: Optional[int] = None) -> int:
+    """Replace ledger rows (for one group or every group) with replayed history"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Taken before the replay, so the history read and the refill see the same writes
+        db.execute(text("LOCK TABLE group_balances IN EXCLUSIVE MODE"))
+    expected = replay_group_balances(db, group_id)
+    clear = delete(GroupBalance)
+    if group_id is not None:
+        clear = clear.where(GroupBalance.group_id == group_id)
+    db.execute(clear)
+    rows = [
+        {"group_id": key[0], "user_id": key[1], "balance": balance}
+        for key, balance in sorted(expected.items())
+    ]
+    if rows:
+        db.execute(insert(GroupBalance), rows)
+    return len(rows)
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from fastapi import HTTPException, status
+
+def _encode(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    """Encode a (date, id) keyset position into an opaque cursor string"""
+    return _encode({"d": date.isoformat(), "i": row_id})
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode an opaque cursor back into its (date, id) keyset position"""
+    try:
+        data = _decode(cursor)
+        return datetime.fromisoformat(data["d"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise _invalid_cursor()
+
+def encode_kind_cursor(date: datetime, kind: str, row_id: int) -> str:
+    """Encode a (date, kind, id) position for feeds that merge rows from several tables"""
+    return _encode({"d": date.isoformat(), "k": kind, "i": row_id})
+
+def decode_kind_cursor(cursor: str, kinds: Tuple[str, ...]) -> Tuple[datetime, str, int]:
+    """Decode a (date, kind, id) cursor, rejecting kinds the feed doesn't have"""
+    try:
+        data = _decode(cursor)
+        if data["k"] not in kinds:
+            raise ValueError(data["k"])
+        return datetime.fromisoformat(data["d"]), data["k"], int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise _invalid_cursor()
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func, insert, select, delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models import Transaction, TransactionMonthlyRollup
+from .dates import year_month
+
+RollupKey = Tuple[int, str, str, str]  # (user_id, month, type, category)
+
+def month_key(date: datetime) -> str:
+    """Return the YYYY-MM rollup bucket for a transaction date"""
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc)
+    return date.strftime("%Y-%m")
+
+def add_delta(
+    deltas: Dict[RollupKey, list],
+    user_id: int,
+    date: datetime,
+    type: str,
+    category: str,
+    amount: float,
+    count: int
+):
+    """Accumulate a (total, count) change for one rollup bucket"""
+    key = (user_id, month_key(date), type, category)
+    delta = deltas.setdefault(key, [0.0, 0])
+    delta[0] += amount
+    delta[1] += count
+
+def add_transaction(deltas: Dict[RollupKey, list], transaction, sign: int = 1):
+    """Record a transaction being added (sign=1) or removed (sign=-1)"""
+    add_delta(
+        deltas, transaction.user_id, transaction.date, transaction.type,
+        transaction.category, sign * transaction.amount, sign
+    )
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: Dict[RollupKey, list]):
+    """Upsert accumulated deltas in one statement, inside the caller's transaction"""
+    # Sorted keys keep lock order stable across concurrent writers
+    rows = [
+        {
+            "user_id": user_id, "month": month, "type": type, "category": category,
+            "total": total, "count": count
+        }
+        for (user_id, month, type, category), (total, count) in sorted(deltas.items())
+        if total or count
+    ]
+    if not rows:
+        return
+
+    dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = dialect_insert(TransactionMonthlyRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "month", "type", "category"],
+        set_={
+            "total": TransactionMonthlyRollup.total + stmt.excluded.total,
+            "count": TransactionMonthlyRollup.count + stmt.excluded.count
+        }
+    )
+    await db.execute(stmt)
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute rollups from raw transactions (for one user or everyone)"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Safe while the API takes writes: writers finish first or wait for the commit,
+        # so no delta lands between the clear and the refill
+        db.execute(text("LOCK TABLE transaction_monthly_rollups IN EXCLUSIVE MODE"))
+    clear = delete(TransactionMonthlyRollup)
+    source = select(
+        Transaction.user_id,
+        year_month(Transaction.date),
+        Transaction.type,
+        Transaction.category,
+        func.sum(Transaction.amount),
+        func.count()
+    )
+    if user_id is not None:
+        clear = clear.where(TransactionMonthlyRollup.user_id == user_id)
+        source = source.where(Transaction.user_id == user_id)
+    source = source.group_by(
+        Transaction.user_id, year_month(Transaction.date), Transaction.type, Transaction.category
+    )
+
+    db.execute(clear)
+    result = db.execute(
+        insert(TransactionMonthlyRollup).from_select(
+            ["user_id", "month", "type", "category", "total", "count"], source
+        )
+    )
+    return result.rowcount
@@ -24,7 +24,9 @@ CREATE TABLE IF NOT EXISTS transactions (
 
 -- Create indexes
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id);
+CREATE INDEX IF NOT EXISTS ix_transactions_user_date_id ON transactions(user_id, date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_transactions_user_type_date ON transactions(user_id, type, date) INCLUDE (amount);
+CREATE INDEX IF NOT EXISTS ix_transactions_user_category_date ON transactions(user_id, category, date) INCLUDE (type, amount);
 
 -- Insert users data
 INSERT INTO users (id, name, email, password_hash, created_at) VALUES
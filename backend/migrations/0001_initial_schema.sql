@@ -0,0 +1,68 @@
+-- Baseline schema matching app/models.py.
+-- Uses IF NOT EXISTS so databases previously created by create_all are adopted as-is.
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users(email);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    amount DOUBLE PRECISION NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    date TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS budgets (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    category VARCHAR(100) NOT NULL,
+    "limit" DOUBLE PRECISION NOT NULL,
+    month VARCHAR(7) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS groups (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    description TEXT,
+    created_by INTEGER NOT NULL REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS group_members (
+    id SERIAL PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES groups(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    joined_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS group_expenses (
+    id SERIAL PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES groups(id),
+    paid_by_user_id INTEGER NOT NULL REFERENCES users(id),
+    amount DOUBLE PRECISION NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    date TIMESTAMP WITH TIME ZONE NOT NULL,
+    splits JSON NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS settlements (
+    id SERIAL PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES groups(id),
+    from_user_id INTEGER NOT NULL REFERENCES users(id),
+    to_user_id INTEGER NOT NULL REFERENCES users(id),
+    amount DOUBLE PRECISION NOT NULL,
+    description VARCHAR(255),
+    settled_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
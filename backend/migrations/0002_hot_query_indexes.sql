@@ -0,0 +1,33 @@
+-- migrate: no-transaction
+-- Composite and covering indexes for the report, dashboard, budget and group query shapes.
+-- CONCURRENTLY avoids locking writers; if a build fails, drop the INVALID index and re-run.
+
+-- Transaction list pagination, export and "recent transactions": (user_id, date, id) keyset
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_date_id
+    ON transactions (user_id, date DESC, id DESC);
+
+-- Income/expense totals by date range (summary, trend, dashboard)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_type_date
+    ON transactions (user_id, type, date) INCLUDE (amount);
+
+-- Per-category spend by date range (budget usage, category breakdown)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_category_date
+    ON transactions (user_id, category, date) INCLUDE (type, amount);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_budgets_user_month_category
+    ON budgets (user_id, month, category);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_group_members_group_user
+    ON group_members (group_id, user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_group_members_user
+    ON group_members (user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_group_expenses_group
+    ON group_expenses (group_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_settlements_group
+    ON settlements (group_id);
+
+-- Superseded by ix_transactions_user_date_id
+DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_user_id;
@@ -0,0 +1,18 @@
+-- Per-user monthly totals by (type, category), maintained by the transactions router.
+-- Rebuild at any time with scripts/rebuild_rollups.py.
+
+CREATE TABLE IF NOT EXISTS transaction_monthly_rollups (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    month VARCHAR(7) NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    total DOUBLE PRECISION NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, month, type, category)
+);
+
+INSERT INTO transaction_monthly_rollups (user_id, month, type, category, total, count)
+SELECT user_id, to_char(date, 'YYYY-MM'), type, category, SUM(amount), COUNT(*)
+FROM transactions
+GROUP BY user_id, to_char(date, 'YYYY-MM'), type, category
+ON CONFLICT (user_id, month, type, category) DO NOTHING;
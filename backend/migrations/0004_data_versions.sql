@@ -0,0 +1,4 @@
+-- Monotonic data versions backing ETag / If-None-Match on GET endpoints.
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS data_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE groups ADD COLUMN IF NOT EXISTS data_version BIGINT NOT NULL DEFAULT 0;
@@ -0,0 +1,33 @@
+-- Per-(group, member) running balances, maintained by the groups router on every
+-- expense and settlement. Check or rebuild with scripts/check_group_balances.py.
+
+CREATE TABLE IF NOT EXISTS group_balances (
+    group_id INTEGER NOT NULL REFERENCES groups(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    balance DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (group_id, user_id)
+);
+
+-- Backfill from history: payers are credited, split members charged by weight,
+-- and settlements move the payer up and the recipient down
+INSERT INTO group_balances (group_id, user_id, balance)
+SELECT group_id, user_id, SUM(delta)
+FROM (
+    SELECT group_id, paid_by_user_id AS user_id, amount AS delta
+    FROM group_expenses
+    UNION ALL
+    SELECT e.group_id, (s.value->>'user_id')::int, -e.amount * (s.value->>'weight')::float / w.total
+    FROM group_expenses e
+    CROSS JOIN LATERAL json_array_elements(e.splits::json) s
+    CROSS JOIN LATERAL (
+        SELECT SUM((x.value->>'weight')::float) AS total
+        FROM json_array_elements(e.splits::json) x
+    ) w
+    WHERE w.total > 0
+    UNION ALL
+    SELECT group_id, from_user_id, amount FROM settlements
+    UNION ALL
+    SELECT group_id, to_user_id, -amount FROM settlements
+) deltas
+GROUP BY group_id, user_id
+ON CONFLICT (group_id, user_id) DO NOTHING;
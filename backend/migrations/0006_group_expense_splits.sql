@@ -0,0 +1,28 @@
+-- One row per expense member with the share precomputed at write time, so balances
+-- can be summed in SQL instead of unpacking the splits JSON in Python.
+
+CREATE TABLE IF NOT EXISTS group_expense_splits (
+    expense_id INTEGER NOT NULL REFERENCES group_expenses(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    weight DOUBLE PRECISION NOT NULL,
+    owed_amount DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (expense_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_group_expense_splits_user ON group_expense_splits (user_id);
+
+-- Backfill from the JSON column; members listed twice are merged, and expenses whose
+-- weights don't add up to anything get no rows (their payer is only credited)
+INSERT INTO group_expense_splits (expense_id, user_id, weight, owed_amount)
+SELECT e.id, (s.value->>'user_id')::int,
+       SUM((s.value->>'weight')::float),
+       SUM(e.amount * (s.value->>'weight')::float / w.total)
+FROM group_expenses e
+CROSS JOIN LATERAL json_array_elements(e.splits::json) s
+CROSS JOIN LATERAL (
+    SELECT SUM((x.value->>'weight')::float) AS total
+    FROM json_array_elements(e.splits::json) x
+) w
+WHERE w.total > 0
+GROUP BY e.id, (s.value->>'user_id')::int
+ON CONFLICT (expense_id, user_id) DO NOTHING;
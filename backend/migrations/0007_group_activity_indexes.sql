@@ -0,0 +1,17 @@
+-- migrate: no-transaction
+-- Keyset indexes for the group activity feed: each branch of the feed seeks straight
+-- to the cursor position and reads forward, however long the group's history is.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_group_expenses_group_date_id
+    ON group_expenses (group_id, date DESC, id DESC);
+
+-- Category-filtered feed
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_group_expenses_group_category_date_id
+    ON group_expenses (group_id, category, date DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_settlements_group_settled_id
+    ON settlements (group_id, settled_at DESC, id DESC);
+
+-- Superseded by the keyset indexes above
+DROP INDEX CONCURRENTLY IF EXISTS ix_group_expenses_group;
+DROP INDEX CONCURRENTLY IF EXISTS ix_settlements_group;
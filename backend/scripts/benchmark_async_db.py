@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Requests/sec benchmark: async DB path vs the previous sync path.
+
+Seeds a throwaway user with transactions, then concurrently requests the
+first page of their transactions from two otherwise identical handlers: one
+awaiting the query on an AsyncSession (the current routers) and one running
+it on the sync Session inside an async def (the previous routers), which
+blocks the event loop for every round trip. The gap grows with network
+latency to the database, so run it against the real DATABASE_URL; on a
+local SQLite file there is no wait to overlap and the sync path wins.
+
+Usage: python scripts/benchmark_async_db.py [--requests 500] [--concurrency 50] [--rows 1000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.auth import create_access_token, get_current_user_id, hash_password
+from app.db import SessionLocal, get_async_db
+from app.models import Transaction, TransactionMonthlyRollup, User
+from app.schemas import TransactionResponse
+
+BENCH_EMAIL = "db-benchmark@example.com"
+PAGE_SIZE = 50
+
+bench_app = FastAPI()
+
+@bench_app.get("/async", response_model=list[TransactionResponse])
+async def get_transactions_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """The current handler shape: the query is awaited on the async engine"""
+    rows = await db.scalars(
+        select(Transaction).where(
+            Transaction.user_id == current_user_id
+        ).order_by(Transaction.date.desc(), Transaction.id.desc()).limit(PAGE_SIZE)
+    )
+    return rows.all()
+
+@bench_app.get("/sync", response_model=list[TransactionResponse])
+async def get_transactions_sync(current_user_id: int = Depends(get_current_user_id)):
+    """The pre-async handler shape: blocking queries inside an async def"""
+    # The session is closed here rather than by a get_db teardown: under load, teardowns
+    # queue behind the blocked loop and the old path exhausts its pool before finishing
+    db = SessionLocal()
+    try:
+        return db.query(Transaction).filter(
+            Transaction.user_id == current_user_id
+        ).order_by(Transaction.date.desc(), Transaction.id.desc()).limit(PAGE_SIZE).all()
+    finally:
+        db.close()
+
+def create_bench_user(rows: int) -> int:
+    db = SessionLocal()
+    try:
+        delete_bench_user(db)
+        user = User(name="DB Benchmark", email=BENCH_EMAIL, password_hash=hash_password("benchmark"))
+        db.add(user)
+        db.flush()
+        start = datetime(2024, 1, 1)
+        db.execute(insert(Transaction), [
+            {
+                "user_id": user.id, "amount": float(i % 100), "description": f"Benchmark {i}",
+                "category": "Food", "type": "expense", "date": start + timedelta(hours=i)
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+def delete_bench_user(db: Session):
+    user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    if user:
+        db.query(Transaction).filter(Transaction.user_id == user.id).delete()
+        db.query(TransactionMonthlyRollup).filter(TransactionMonthlyRollup.user_id == user.id).delete()
+        db.delete(user)
+        db.commit()
+
+async def drive(path: str, token: str, total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=bench_app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        remaining = total
+        failures = 0
+
+        async def worker():
+            nonlocal remaining, failures
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(path)
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, failures
+
+async def run(token: str, total: int, concurrency: int) -> dict:
+    # One event loop for every run: async engine connections are bound to the loop that opened them
+    results = {}
+    for name in ("sync", "async"):
+        await drive(f"/{name}", token, concurrency, concurrency)  # warm up the connection pools
+        elapsed, failures = await drive(f"/{name}", token, total, concurrency)
+        results[name] = total / elapsed
+        print(f"   {name:>5}: {results[name]:8.1f} req/s ({elapsed:.2f}s, {failures} failures)")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare async and sync DB request throughput")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--rows", type=int, default=1000, help="Transactions to seed")
+    args = parser.parse_args()
+
+    print(f"⚡ DB path benchmark: {args.requests} requests, concurrency {args.concurrency}, {args.rows} rows")
+    user_id = create_bench_user(args.rows)
+    token = create_access_token(data={"sub": str(user_id)})
+    try:
+        results = asyncio.run(run(token, args.requests, args.concurrency))
+        print(f"✅ async/sync throughput ratio: {results['async'] / results['sync']:.2f}x")
+    finally:
+        db = SessionLocal()
+        try:
+            delete_bench_user(db)
+        finally:
+            db.close()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark.
+
+Fires concurrent POST /api/auth/login requests at the app in-process and,
+at the same time, polls /api/health to show how long other requests wait
+behind password hashing. Run once with the bounded hashing pool (default)
+and once with --inline, which hashes on the event loop like the old code.
+
+Usage: python scripts/benchmark_login.py [--requests 200] [--concurrency 20] [--inline]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+from app.main import app
+from app.db import SessionLocal
+from app.models import User
+from app.auth import PasswordHasher, hash_password
+from app.config import settings
+from app.routers import auth as auth_router
+
+BENCH_EMAIL = "login-benchmark@example.com"
+BENCH_PASSWORD = "benchmark-password"
+PROBE_INTERVAL = 0.01
+
+class InlineHasher(PasswordHasher):
+    """Hashes on the calling thread, blocking the event loop (the pre-pool behaviour)"""
+
+    async def _run(self, func, *args):
+        return func(*args)
+
+def create_bench_user():
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == BENCH_EMAIL).delete()
+        db.add(User(name="Login Benchmark", email=BENCH_EMAIL, password_hash=hash_password(BENCH_PASSWORD)))
+        db.commit()
+    finally:
+        db.close()
+
+def delete_bench_user():
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == BENCH_EMAIL).delete()
+        db.commit()
+    finally:
+        db.close()
+
+async def run(total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+        statuses = {}
+        health_latencies = []
+        done = asyncio.Event()
+
+        async def login_worker():
+            while not queue.empty():
+                queue.get_nowait()
+                response = await client.post(
+                    "/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def health_probe():
+            while not done.is_set():
+                # Timed from before the pause, so time spent waiting for a blocked loop counts
+                started = time.perf_counter()
+                await asyncio.sleep(PROBE_INTERVAL)
+                await client.get("/api/health")
+                health_latencies.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+        probe = asyncio.create_task(health_probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    return elapsed, statuses, health_latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput")
+    parser.add_argument("--requests", type=int, default=200, help="Total login requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--inline", action="store_true", help="Hash on the event loop instead of the pool")
+    args = parser.parse_args()
+
+    if args.inline:
+        auth_router.password_hasher = InlineHasher(1, args.requests)
+    mode = "inline (event loop)" if args.inline else f"pool ({settings.PASSWORD_HASH_WORKERS} workers)"
+    print(f"🔐 Login benchmark: {args.requests} requests, concurrency {args.concurrency}, "
+          f"bcrypt cost {settings.BCRYPT_ROUNDS}, hashing {mode}")
+
+    create_bench_user()
+    try:
+        elapsed, statuses, health = asyncio.run(run(args.requests, args.concurrency))
+    finally:
+        delete_bench_user()
+
+    print(f"✅ {args.requests / elapsed:.1f} logins/s ({elapsed:.2f}s total), statuses: {statuses}")
+    if health:
+        health.sort()
+        p95 = health[max(0, int(len(health) * 0.95) - 1)]
+        print(f"   /api/health during load: median {statistics.median(health):.1f} ms, "
+              f"p95 {p95:.1f} ms, max {health[-1]:.1f} ms ({len(health)} probes)")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
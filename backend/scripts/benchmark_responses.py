@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Response encoding benchmark.
+
+Pushes a synthetic get_transactions page through the same steps a request
+takes: response_model serialization, rendering with the stdlib JSONResponse
+(before) or ORJSONResponse (after), then the compression middleware. Reports
+time per step and bytes on the wire for each Accept-Encoding. The page is
+built in memory, so no database is needed.
+
+Usage: python scripts/benchmark_responses.py [--rows 50000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from app.main import app
+from app.models import Transaction
+from app.schemas import TransactionPageResponse
+from app.compression import CompressionMiddleware, brotli
+from app.config import settings
+
+CATEGORIES = ["Food", "Transport", "Rent", "Utilities", "Entertainment", "Salary", "Shopping"]
+
+def build_page(rows: int, seed: int) -> TransactionPageResponse:
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)
+    items = [
+        Transaction(
+            id=index + 1,
+            user_id=1,
+            amount=round(rng.uniform(1, 500), 2),
+            description=f"Transaction {index + 1}",
+            category=rng.choice(CATEGORIES),
+            type=rng.choice(["expense", "expense", "income"]),
+            date=now - timedelta(hours=index),
+            created_at=now - timedelta(hours=index)
+        )
+        for index in range(rows)
+    ]
+    return TransactionPageResponse(items=items, next_cursor=None)
+
+async def timed(func, repeat: int):
+    """Median wall time of func in ms, and its last result; func may return an awaitable"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        if asyncio.iscoroutine(result):
+            result = await result
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), result
+
+async def through_middleware(body: bytes, accept_encoding: str) -> bytes:
+    """Send a rendered body through CompressionMiddleware and collect what goes on the wire"""
+    async def endpoint(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    middleware = CompressionMiddleware(
+        endpoint,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await middleware(scope, receive, send)
+    return b"".join(chunks)
+
+async def run(args) -> bool:
+    route = next(
+        route for route in app.routes
+        if isinstance(route, APIRoute) and route.path == "/api/transactions/" and "GET" in route.methods
+    )
+    page = build_page(args.rows, args.seed)
+    print(f"📦 get_transactions response with {args.rows} rows (median of {args.repeat} runs)")
+    print(f"   default response class: {app.router.default_response_class.__name__}")
+
+    model_ms, content = await timed(
+        lambda: serialize_response(field=route.response_field, response_content=page, is_coroutine=True),
+        args.repeat
+    )
+    print(f"   response_model serialization: {model_ms:>8.1f} ms (same before and after)")
+
+    stdlib_ms, stdlib_body = await timed(lambda: JSONResponse(content).body, args.repeat)
+    orjson_ms, orjson_body = await timed(lambda: ORJSONResponse(content).body, args.repeat)
+    print(f"   render, stdlib json:          {stdlib_ms:>8.1f} ms  {len(stdlib_body):>10,} bytes")
+    print(f"   render, orjson:               {orjson_ms:>8.1f} ms  {len(orjson_body):>10,} bytes "
+          f"({stdlib_ms / orjson_ms:.1f}x faster)")
+
+    print(f"   {'Accept-Encoding':<16} {'compress ms':>11} {'wire bytes':>12} {'ratio':>7}")
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    for accept_encoding in encodings:
+        compress_ms, wire = await timed(lambda: through_middleware(orjson_body, accept_encoding), args.repeat)
+        print(f"   {accept_encoding:<16} {compress_ms:>11.1f} {len(wire):>12,} "
+              f"{len(orjson_body) / len(wire):>6.1f}x")
+    if brotli is None:
+        print("   ⚠️  brotli is not installed; only gzip was measured")
+
+    # Browsers send "gzip, deflate, br", so the last encoding measured is what they get
+    print(f"✅ Before: {model_ms + stdlib_ms:.1f} ms, {len(stdlib_body):,} bytes; "
+          f"after ({accept_encoding}): {model_ms + orjson_ms + compress_ms:.1f} ms, {len(wire):,} bytes")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure JSON rendering and compression of a large transaction page")
+    parser.add_argument("--rows", type=int, default=50000, help="Transactions in the page")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per step; the median is reported")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Settlement solver benchmark.
+
+Builds random groups whose balances come from realistic shared expenses
+(random payer, random subset of members splitting equally) and compares the
+previous largest-creditor/largest-debtor greedy with the current solver on
+number of transfers and solve time.
+
+Usage: python scripts/benchmark_settlements.py [--trials 20] [--sizes 4,8,12,16,20,50,200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.balance import calculate_minimal_settlements, EXACT_SOLVER_MAX_MEMBERS
+
+def legacy_greedy(balances):
+    """The previous greedy matcher, kept here as the baseline"""
+    creditors = sorted(((u, b) for u, b in balances.items() if b > 0), key=lambda x: x[1], reverse=True)
+    debtors = sorted(((u, -b) for u, b in balances.items() if b < 0), key=lambda x: x[1], reverse=True)
+    transfers = 0
+    i = j = 0
+    while i < len(creditors) and j < len(debtors):
+        amount = min(creditors[i][1], debtors[j][1])
+        if amount > 0.01:
+            transfers += 1
+        creditors[i] = (creditors[i][0], creditors[i][1] - amount)
+        debtors[j] = (debtors[j][0], debtors[j][1] - amount)
+        if creditors[i][1] < 0.01:
+            i += 1
+        if debtors[j][1] < 0.01:
+            j += 1
+    return transfers
+
+def random_balances(rng: random.Random, members: int) -> dict:
+    balances = {user_id: 0.0 for user_id in range(1, members + 1)}
+    for _ in range(members * 3):
+        payer = rng.randint(1, members)
+        sharers = rng.sample(range(1, members + 1), rng.randint(2, min(members, 6)))
+        amount = rng.choice([10, 20, 30, 45, 60, 90, 120])
+        balances[payer] += amount
+        for user_id in sharers:
+            balances[user_id] -= amount / len(sharers)
+    return balances
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare settlement solvers")
+    parser.add_argument("--trials", type=int, default=20, help="Random groups per size")
+    parser.add_argument("--sizes", default="4,8,12,16,20,50,200", help="Comma-separated group sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"🧮 Settlement benchmark: {args.trials} groups per size, exact solver up to "
+          f"{EXACT_SOLVER_MAX_MEMBERS} non-zero members")
+    print(f"   {'members':>7} {'greedy':>8} {'solver':>8} {'saved':>7} {'greedy ms':>10} {'solver ms':>10}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        greedy_counts, solver_counts, greedy_times, solver_times = [], [], [], []
+        for _ in range(args.trials):
+            balances = random_balances(rng, size)
+
+            started = time.perf_counter()
+            greedy_counts.append(legacy_greedy(balances))
+            greedy_times.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            solver_counts.append(len(calculate_minimal_settlements(balances, {})))
+            solver_times.append((time.perf_counter() - started) * 1000)
+
+        greedy = statistics.mean(greedy_counts)
+        solver = statistics.mean(solver_counts)
+        print(f"   {size:>7} {greedy:>8.2f} {solver:>8.2f} {greedy - solver:>7.2f} "
+              f"{statistics.mean(greedy_times):>10.3f} {statistics.mean(solver_times):>10.3f}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
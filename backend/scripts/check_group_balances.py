@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Check the group_balances ledger against the expense and settlement history,
+and optionally rebuild it. Use after a backfill, a manual data fix, or when
+balances look wrong. With --fix, expenses saved before the splits table
+existed (SQLite dev databases) also get their split rows.
+
+Usage: python scripts/check_group_balances.py [--group GROUP_ID] [--fix]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db import SessionLocal
+from app.utils.ledger import backfill_expense_splits, check_group_balances, rebuild_group_balances
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or rebuild group balance ledgers")
+    parser.add_argument("--group", type=int, default=None, help="Only check this group")
+    parser.add_argument("--fix", action="store_true", help="Rebuild ledgers that don't match history")
+    args = parser.parse_args()
+
+    scope = f"group {args.group}" if args.group is not None else "all groups"
+    print(f"🔍 Checking balance ledger for {scope}...")
+    db = SessionLocal()
+    try:
+        if args.fix:
+            filled = backfill_expense_splits(db)
+            if filled:
+                db.flush()
+                print(f"🔧 Created split rows for {filled} older expenses")
+
+        mismatches = check_group_balances(db, args.group)
+        if not mismatches:
+            db.commit()
+            print("✅ Ledger matches history")
+            return True
+
+        for (group_id, user_id), stored, expected in mismatches:
+            print(f"   group {group_id}, user {user_id}: ledger {stored:.2f}, history {expected:.2f}")
+        print(f"⚠️  {len(mismatches)} mismatched balances")
+        if not args.fix:
+            return False
+
+        # Only groups that drifted are rebuilt; each one is replaced from its own history
+        for group_id in sorted({group_id for (group_id, _), _, _ in mismatches}):
+            rebuild_group_balances(db, group_id)
+        db.commit()
+        print("✅ Rebuilt affected groups")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Check failed: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
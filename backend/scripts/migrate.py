@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Apply pending schema migrations.
+Run once per deploy (before starting the API workers), not on every boot.
+
+Some migrations backfill derived tables while the previous release is still
+serving. Writes it makes in that window aren't reflected in them, so the
+matching repair scripts must run again once the new release is live; this
+script prints them when such a migration is applied.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db import engine
+from app.migrations import run_migrations, discover_migrations, applied_versions
+
+# Migrations that backfill derived data, and what to run after the cutover to catch up
+POST_DEPLOY_STEPS = {
+    "0003": "python scripts/rebuild_rollups.py",
+    "0005": "python scripts/check_group_balances.py --fix",
+    "0006": "python scripts/check_group_balances.py --fix",
+}
+
+def main():
+    if "--status" in sys.argv:
+        done = applied_versions(engine)
+        for version, path in discover_migrations():
+            mark = "✅" if version in done else "⏳"
+            print(f"{mark} {path.name}")
+        return True
+
+    print("🔧 Applying migrations...")
+    try:
+        applied = run_migrations(engine)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+    if applied:
+        for version in applied:
+            print(f"✅ Applied {version}")
+        steps = sorted({POST_DEPLOY_STEPS[version] for version in applied if version in POST_DEPLOY_STEPS})
+        if steps:
+            print("⚠️  Once the new release is serving and the old workers are gone, run:")
+            for step in steps:
+                print(f"   {step}")
+    else:
+        print("✅ Schema is up to date")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
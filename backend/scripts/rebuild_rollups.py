@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Rebuild the transaction_monthly_rollups table from raw transactions.
+Use after a backfill, a manual data fix, or to repair drift.
+
+Usage: python scripts/rebuild_rollups.py [--user USER_ID]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db import SessionLocal
+from app.utils.rollups import rebuild_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild monthly transaction rollups")
+    parser.add_argument("--user", type=int, default=None, help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    scope = f"user {args.user}" if args.user is not None else "all users"
+    print(f"🔧 Rebuilding rollups for {scope}...")
+    db = SessionLocal()
+    try:
+        rows = rebuild_rollups(db, args.user)
+        db.commit()
+        print(f"✅ Wrote {rows} rollup rows")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
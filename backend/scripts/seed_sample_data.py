@@ -15,6 +15,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.db import get_db, engine
 from app.models import User, Transaction, Budget, Group, GroupMember, GroupExpense
 from app.auth import hash_password
+from app.utils.ledger import expense_split_rows, rebuild_group_balances
 
 def create_sample_users(db: Session):
     """Create sample users"""
@@ -412,10 +413,14 @@ def create_sample_group_expenses(db: Session, users: dict, groups: dict):
             description=expense_data["description"],
             category=expense_data["category"],
             date=expense_data["date"],
-            splits=expense_data["splits"]
+            splits=expense_data["splits"],
+            split_rows=expense_split_rows(expense_data["amount"], expense_data["splits"])
         )
         db.add(expense)
     
+    db.flush()
+    # Seeded expenses bypass the API, so rebuild the balance ledgers from history
+    rebuild_group_balances(db)
     db.commit()
 
 def main():
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Point the app at a throwaway SQLite database before anything imports it
+_db_dir = tempfile.mkdtemp(prefix="budget-tracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from app.db import engine
+from app.main import app
+from app.migrations import run_migrations
+
+@pytest.fixture(scope="session")
+def client():
+    run_migrations(engine)
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def make_user(client):
+    """Register a fresh user and return (user_id, auth headers)"""
+    def create(name: str = "Test User"):
+        email = f"{uuid.uuid4().hex}@example.com"
+        client.post("/api/auth/register", json={"name": name, "email": email, "password": "demo1234"})
+        token = client.post("/api/auth/login", json={"email": email, "password": "demo1234"}).json()["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        return client.get("/api/auth/me", headers=headers).json()["id"], headers
+    return create
+
+@pytest.fixture
+def auth_headers(make_user):
+    return make_user()[1]
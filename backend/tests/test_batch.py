@@ -0,0 +1,16 @@
+def test_batch_paths_match_with_or_without_trailing_slash(client, auth_headers):
+    response = client.post("/api/batch", headers=auth_headers, json={"requests": [
+        {"id": "groups", "method": "GET", "path": "/api/groups"},
+        {"id": "create", "method": "POST", "path": "/api/groups", "body": {"name": "Trip"}},
+        {"id": "categories", "method": "GET", "path": "/api/dashboard/categories/"},
+    ]})
+    assert response.status_code == 200
+    results = {item["id"]: item for item in response.json()["responses"]}
+
+    # The router would answer 307 to these; the batch resolves the route instead
+    assert results["groups"]["status"] == 200
+    assert results["groups"]["body"] == []
+    assert results["create"]["status"] == 200
+    assert results["create"]["body"]["name"] == "Trip"
+    assert results["categories"]["status"] == 200
+    assert "Food" in results["categories"]["body"]["expense_categories"]
@@ -0,0 +1,14 @@
+from app.cache import MemoryCacheBackend
+
+def test_memory_generations_are_bounded_and_never_revert():
+    backend = MemoryCacheBackend(max_entries=2)
+    before = {name: backend.get_generation(name) for name in ("a", "b", "c")}
+
+    for name in ("a", "b", "c"):
+        backend.bump_generation(name)
+    assert len(backend._generations) == 2
+
+    # "a" was trimmed, but must not fall back to a generation entries were stored under
+    assert "a" not in backend._generations
+    assert backend.get_generation("a") != before["a"]
+    assert backend.get_generation("c") != before["c"]
@@ -0,0 +1,43 @@
+import asyncio
+import zlib
+
+import pytest
+
+from app.compression import CompressionMiddleware, brotli
+
+def stream_through_middleware(parts, accept_encoding):
+    """Run a streaming endpoint through the middleware and return the body chunks it sends"""
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        for index, part in enumerate(parts):
+            await send({"type": "http.response.body", "body": part, "more_body": index < len(parts) - 1})
+
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    middleware = CompressionMiddleware(endpoint, minimum_size=10)
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(middleware(scope, receive, send))
+    return chunks
+
+PARTS = [b'{"id": 1, "description": "first row"}\n' * 50, b'{"id": 2, "description": "second row"}\n' * 50]
+
+def test_gzip_stream_flushes_each_chunk():
+    chunks = stream_through_middleware(PARTS, "gzip")
+    decoder = zlib.decompressobj(31)
+    # The first chunk decodes on its own, before the response has finished
+    assert decoder.decompress(chunks[0]) == PARTS[0]
+    assert decoder.decompress(b"".join(chunks[1:])) == PARTS[1]
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_brotli_stream_flushes_each_chunk():
+    chunks = stream_through_middleware(PARTS, "br")
+    decoder = brotli.Decompressor()
+    assert decoder.process(chunks[0]) == PARTS[0]
+    assert decoder.process(b"".join(chunks[1:])) == PARTS[1]
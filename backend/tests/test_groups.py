@@ -0,0 +1,13 @@
+def test_group_etag_answers_members_and_rejects_outsiders(client, make_user):
+    _, owner = make_user("Owner")
+    _, outsider = make_user("Outsider")
+    group = client.post("/api/groups/", headers=owner, json={"name": "Flat"}).json()
+    url = f"/api/groups/{group['id']}/balances"
+
+    first = client.get(url, headers=owner)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get(url, headers={**owner, "If-None-Match": etag}).status_code == 304
+
+    # A copied tag must not let a non-member learn anything, not even "unchanged"
+    assert client.get(url, headers={**outsider, "If-None-Match": etag}).status_code == 403
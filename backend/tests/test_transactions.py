@@ -0,0 +1,44 @@
+import json
+
+def test_import_accepts_mixed_naive_and_offset_dates(client, auth_headers):
+    rows = [
+        {"date": "2025-03-01", "amount": 12.5, "description": "Coffee", "category": "Food", "type": "expense"},
+        {"date": "2025-03-02T09:30:00+05:30", "amount": 40, "description": "Taxi", "category": "Transport", "type": "expense"},
+        {"date": "2025-03-03T18:00:00Z", "amount": 1000, "description": "Salary", "category": "Salary", "type": "income"},
+    ]
+    upload = {"file": ("statement.json", json.dumps(rows), "application/json")}
+
+    response = client.post("/api/transactions/import", headers=auth_headers, files=upload)
+    assert response.status_code == 200
+    assert response.json() == {"imported": 3, "duplicates": 0, "errors": []}
+
+    # Offsets are stored as naive UTC, so a re-import is recognised row for row
+    again = client.post("/api/transactions/import", headers=auth_headers, files=upload)
+    assert again.json()["imported"] == 0
+    assert again.json()["duplicates"] == 3
+
+    dates = {
+        item["description"]: item["date"]
+        for item in client.get("/api/transactions/", headers=auth_headers).json()["items"]
+    }
+    assert dates["Taxi"] == "2025-03-02T04:00:00"
+    assert dates["Salary"] == "2025-03-03T18:00:00"
+
+def test_batch_update_rejects_null_for_required_fields(client, auth_headers):
+    created = client.post("/api/transactions/", headers=auth_headers, json={
+        "amount": 25, "description": "Lunch", "category": "Food", "type": "expense", "date": "2025-04-01T12:00:00"
+    }).json()
+
+    response = client.post("/api/transactions/batch", headers=auth_headers, json={"operations": [
+        {"op": "update", "id": created["id"], "data": {"category": None}},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["committed"] is False
+    assert body["results"][0]["status"] == "error"
+    assert "category" in body["results"][0]["detail"]
+
+    stored = {
+        item["id"]: item for item in client.get("/api/transactions/", headers=auth_headers).json()["items"]
+    }
+    assert stored[created["id"]]["category"] == "Food"
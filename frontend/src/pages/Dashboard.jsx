@@ -34,8 +34,10 @@ export default function Dashboard(){
     if(token){
       setLoading(true)
       Promise.all([
-        api.get('/reports/summary', { params: { month }}).then(({data})=> setSummary(data)),
-        api.get('/transactions?limit=5').then(({data})=> setRecentTransactions(data.items || [])),
+        api.get('/dashboard/bundle', { params: { month }}).then(({data})=> {
+          setSummary(data.summary)
+          setRecentTransactions(data.overview.recent_transactions || [])
+        }),
         api.get('/auth/me').then(({data})=> {
           console.log('User info from API:', data)
           setUserInfo(data)
@@ -43,6 +43,12 @@ REM Install backend dependencies
 echo Installing backend dependencies...
 pip install -r backend\requirements.txt
 
+REM Apply schema migrations
+echo Applying database migrations...
+cd backend
+python scripts\migrate.py
+cd ..
+
 REM Start backend server
 echo 🔧 Starting backend server on http://localhost:8000...
 start "Backend Server" cmd /k "cd backend && uvicorn app.main:app --reload --host 0.0.0.0 --port 8000"
@@ -45,6 +45,10 @@ def setup_backend():
     print("Installing backend dependencies...")
     subprocess.run(pip_cmd + ["install", "-r", "backend/requirements.txt"], check=True)
     
+    # Apply schema migrations
+    print("Applying database migrations...")
+    subprocess.run(python_cmd + ["scripts/migrate.py"], cwd="backend", check=True)
+    
     # Start backend
     print("🔧 Starting backend server on http://localhost:8000...")
     uvicorn_cmd = python_cmd + ["-m", "uvicorn", "app.main:app", "--reload", "--host", "0.0.0.0", "--port", "8000"]
@@ -48,6 +48,10 @@ source backend/venv/bin/activate
 echo "Installing backend dependencies..."
 pip install -r backend/requirements.txt
 
+# Apply schema migrations
+echo "Applying database migrations..."
+(cd backend && python scripts/migrate.py)
+
 # Start backend server
 echo "🔧 Starting backend server on http://localhost:8000..."
 cd backend